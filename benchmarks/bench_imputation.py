@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""Compares the whole-frame NaN imputation in autoclean() against the original column-by-column loop
+
+Usage: python benchmarks/bench_imputation.py [n_rows] [n_columns]
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from datacleaner import autoclean
+
+
+def column_loop_imputation(input_dataframe):
+    """The column-by-column imputation loop that autoclean() used before it was vectorized"""
+    for column in input_dataframe.columns.values:
+        try:
+            input_dataframe[column].fillna(input_dataframe[column].median(), inplace=True)
+        except TypeError:
+            most_frequent = input_dataframe[column].mode()
+            if len(most_frequent) > 0:
+                input_dataframe[column].fillna(input_dataframe[column].mode()[0], inplace=True)
+            else:
+                input_dataframe[column].fillna(method='bfill', inplace=True)
+                input_dataframe[column].fillna(method='ffill', inplace=True)
+    return input_dataframe
+
+
+def make_wide_dataframe(n_rows, n_columns, nan_fraction=0.05, seed=300):
+    """Creates a wide, mostly numerical data set with a few string columns and some NaNs"""
+    random_state = np.random.RandomState(seed)
+    values = random_state.rand(n_rows, n_columns)
+    values[random_state.rand(n_rows, n_columns) < nan_fraction] = np.nan
+    dataframe = pd.DataFrame(values, columns=['column{}'.format(i) for i in range(n_columns)])
+
+    for i in range(0, n_columns, 100):
+        strings = pd.Series(random_state.choice(['oranges', 'apples', 'bananas'], n_rows), dtype=object)
+        strings[random_state.rand(n_rows) < nan_fraction] = np.nan
+        dataframe['column{}'.format(i)] = strings
+
+    return dataframe
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    data = make_wide_dataframe(n_rows, n_columns)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        loop_time = min(timeit.repeat(lambda: column_loop_imputation(data.copy()), number=1, repeat=3))
+    vectorized_time = min(timeit.repeat(lambda: autoclean(data.copy(), encoder=lambda: _NoOpEncoder(),
+                                                          ignore_update_check=True),
+                                        number=1, repeat=3))
+
+    print('{} rows x {} columns'.format(n_rows, n_columns))
+    print('column loop imputation: {:.3f} s'.format(loop_time))
+    print('whole-frame imputation: {:.3f} s'.format(vectorized_time))
+    print('speedup: {:.1f}x'.format(loop_time / vectorized_time))
+
+
+class _NoOpEncoder(object):
+    """Leaves the string columns as they are so that only the imputation is timed"""
+
+    def fit(self, values):
+        return self
+
+    def transform(self, values):
+        return values
+
+    def fit_transform(self, values):
+        return values
+
+
+if __name__ == '__main__':
+    main()
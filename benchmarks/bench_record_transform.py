@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Compares the latency of cleaning single records with DataCleaner.transform() and with a CompiledCleaner
+
+Usage: python benchmarks/bench_record_transform.py [n_records]
+"""
+
+from __future__ import print_function
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+from datacleaner import DataCleaner
+
+ADULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'adult.csv.gz')
+
+
+def best_seconds_per_call(function, number, repeat=5):
+    """Returns the best time of a single call of `function` over several repeats"""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def main():
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    adult_data = pd.read_csv(ADULT_FILENAME, sep='\t', compression='gzip')
+    training_data = adult_data[:-n_records]
+    testing_data = adult_data[-n_records:]
+
+    cleaner = DataCleaner(ignore_update_check=True, handle_unknown='unknown').fit(training_data)
+    compiled_cleaner = cleaner.compile()
+    record = testing_data.iloc[0].to_dict()
+    records = testing_data.to_dict('records')
+
+    dataframe_time = best_seconds_per_call(lambda: cleaner.transform(pd.DataFrame([record])), number=100)
+    compiled_time = best_seconds_per_call(lambda: compiled_cleaner.transform(record), number=10000)
+    dataframe_batch_time = best_seconds_per_call(lambda: cleaner.transform(pd.DataFrame(records)), number=100)
+    compiled_batch_time = best_seconds_per_call(lambda: compiled_cleaner.transform(records), number=1000)
+
+    print('{} columns'.format(len(training_data.columns)))
+    for label, seconds in [('DataCleaner.transform, 1 record', dataframe_time),
+                           ('CompiledCleaner.transform, 1 record', compiled_time),
+                           ('DataCleaner.transform, {} records'.format(n_records), dataframe_batch_time / n_records),
+                           ('CompiledCleaner.transform, {} records'.format(n_records),
+                            compiled_batch_time / n_records)]:
+        print('{:<40} {:>10.1f} us per record'.format(label + ':', seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
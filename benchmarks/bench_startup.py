@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Measures how long it takes to import datacleaner and to start the datacleaner command line tool
+
+Every measurement runs in a fresh Python interpreter. "eager import" imports the same modules that
+datacleaner used to import up front (scikit-learn, joblib, and update_checker) for comparison.
+
+Usage: python benchmarks/bench_startup.py [n_runs]
+"""
+
+from __future__ import print_function
+import subprocess
+import sys
+import time
+
+STARTUP_COMMANDS = [
+    ('python', 'pass'),
+    ('import pandas', 'import pandas'),
+    ('import datacleaner', 'import datacleaner'),
+    ('eager import', 'import datacleaner, sklearn.base, sklearn.preprocessing, joblib, update_checker'),
+    ('datacleaner --version', 'import sys; sys.argv = ["datacleaner", "--version"]; '
+                              'from datacleaner import main; main()'),
+]
+
+
+def time_command(code, n_runs):
+    """Returns the fastest wall-clock time of running `code` in a new Python interpreter"""
+    run_times = []
+    for _ in range(n_runs):
+        start_time = time.time()
+        subprocess.check_call([sys.executable, '-c', code], stdout=subprocess.PIPE)
+        run_times.append(time.time() - start_time)
+    return min(run_times)
+
+
+def main():
+    n_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, code in STARTUP_COMMANDS:
+        print('{:<25} {:>8.3f} s'.format(name, time_command(code, n_runs)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Compares the up-front dtype classification of autoclean() against dispatching on the TypeError of median()
+
+Times the computation of the fill values and the neighbor fill of a wide, mostly-string data set.
+
+Usage: python benchmarks/bench_string_imputation.py [n_rows] [n_columns]
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from datacleaner.datacleaner import _compute_fill_values, _fill_from_neighbors
+
+
+def exception_dispatch_fill_values(input_dataframe):
+    """The fill value computation that tried median() on every column and fell back to mode() on TypeError"""
+    fill_values = {}
+    unfillable_columns = []
+    for column in input_dataframe.columns.values:
+        try:
+            fill_values[column] = input_dataframe[column].median()
+        except TypeError:
+            most_frequent = input_dataframe[column].mode()
+            if len(most_frequent) > 0:
+                fill_values[column] = most_frequent[0]
+            else:
+                unfillable_columns.append(column)
+
+    for column in unfillable_columns:
+        input_dataframe[column] = input_dataframe[column].bfill().ffill()
+    return fill_values
+
+
+def classified_fill_values(input_dataframe):
+    """The fill value computation of autoclean() with a single neighbor fill for all columns without a mode"""
+    fill_values, unfillable_columns, _ = _compute_fill_values(input_dataframe, list(input_dataframe.columns))
+    if len(unfillable_columns) > 0:
+        input_dataframe[unfillable_columns] = _fill_from_neighbors(input_dataframe, unfillable_columns)
+    return fill_values
+
+
+def make_string_dataframe(n_rows, n_columns, nan_fraction=0.05, seed=300):
+    """Creates a wide data set of string columns with a numerical column every 10 and an empty one every 50"""
+    random_state = np.random.RandomState(seed)
+    categories = np.array(['oranges', 'apples', 'bananas', 'cherries'], dtype=object)
+    data = {}
+    for i in range(n_columns):
+        if i % 50 == 49:
+            values = pd.Series([None] * n_rows, dtype=object)
+        elif i % 10 == 9:
+            values = pd.Series(random_state.rand(n_rows))
+        else:
+            values = pd.Series(categories[random_state.randint(0, len(categories), n_rows)])
+        values[random_state.rand(n_rows) < nan_fraction] = np.nan
+        data['column{}'.format(i)] = values
+
+    return pd.DataFrame(data)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    data = make_string_dataframe(n_rows, n_columns)
+
+    dispatch_time = min(timeit.repeat(lambda: exception_dispatch_fill_values(data.copy()), number=1, repeat=3))
+    classified_time = min(timeit.repeat(lambda: classified_fill_values(data.copy()), number=1, repeat=3))
+
+    print('{} rows x {} columns'.format(n_rows, n_columns))
+    print('TypeError dispatch:     {:.3f} s'.format(dispatch_time))
+    print('dtype classification:   {:.3f} s'.format(classified_time))
+    print('speedup: {:.1f}x'.format(dispatch_time / classified_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark suite for autoclean() and autoclean_cv() that records run time and peak memory per case
+
+Every case varies one property of a base data set (rows, columns, NaN density, or string cardinality),
+plus one case on the bundled adult data set. Results can be saved as a baseline and later compared
+against it, so that changes to the cleaning code can be judged with numbers.
+
+Usage:
+    python benchmarks/suite.py [--save results.json] [--compare baseline.json] [--filter SUBSTRING] [--quick]
+
+With --compare, the script exits with status 1 if any case got slower or used more memory than the
+baseline by more than the given tolerances.
+"""
+
+from __future__ import print_function
+import argparse
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from datacleaner import autoclean, autoclean_cv
+
+ADULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'adult.csv.gz')
+
+BASE_CASE = {'rows': 100000, 'columns': 20, 'nan_density': 0.05, 'cardinality': 100}
+CASE_VARIATIONS = {'rows': [10000, 1000000],
+                   'columns': [5, 200],
+                   'nan_density': [0., 0.3],
+                   'cardinality': [2, 100000]}
+
+
+def make_dataframe(rows, columns, nan_density, cardinality, string_fraction=0.3, seed=300):
+    """Creates a data set with numerical and string columns and NaNs scattered at random"""
+    random_state = np.random.RandomState(seed)
+    categories = np.array(['category{}'.format(i) for i in range(cardinality)], dtype=object)
+    n_string_columns = int(round(columns * string_fraction))
+
+    data = {}
+    for i in range(columns):
+        if i < n_string_columns:
+            values = pd.Series(categories[random_state.randint(0, cardinality, rows)])
+        else:
+            values = pd.Series(random_state.rand(rows))
+        values[random_state.rand(rows) < nan_density] = np.nan
+        data['column{}'.format(i)] = values
+
+    return pd.DataFrame(data)
+
+
+def benchmark_cases(quick=False):
+    """Returns (case name, data set factory) pairs for all benchmark cases"""
+    def scaled(case):
+        case = dict(case)
+        if quick:
+            case['rows'] = max(1000, case['rows'] // 10)
+        return case
+
+    cases = [('base', scaled(BASE_CASE))]
+    for parameter, values in sorted(CASE_VARIATIONS.items()):
+        for value in values:
+            case = dict(BASE_CASE)
+            case[parameter] = value
+            cases.append(('{}={}'.format(parameter, value), scaled(case)))
+
+    benchmark_factories = [(name, lambda case=case: make_dataframe(**case)) for name, case in cases]
+    benchmark_factories.append(('adult', lambda: pd.read_csv(ADULT_FILENAME, sep='\t', compression='gzip')))
+    return benchmark_factories
+
+
+def measure(function, make_arguments, repeat):
+    """Returns the best run time in seconds and the peak memory in bytes of `function(*make_arguments())`"""
+    def timed_run():
+        arguments = make_arguments()
+        gc.collect()
+        return timeit.timeit(lambda: function(*arguments), number=1)
+
+    run_time = min(timed_run() for _ in range(repeat))
+
+    arguments = make_arguments()
+    gc.collect()
+    tracemalloc.start()
+    function(*arguments)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return run_time, peak_memory
+
+
+def run_suite(name_filter=None, quick=False, repeat=3):
+    """Runs all benchmark cases and returns their results, keyed by case name"""
+    results = {}
+    for case_name, make_dataframe_for_case in benchmark_cases(quick):
+        data = make_dataframe_for_case()
+        split = len(data) // 2
+
+        functions = [
+            ('autoclean[{}]'.format(case_name),
+             lambda data: autoclean(data, ignore_update_check=True),
+             lambda: (data.copy(),)),
+            ('autoclean_cv[{}]'.format(case_name),
+             lambda training_data, testing_data: autoclean_cv(training_data, testing_data,
+                                                              handle_unknown='unknown', ignore_update_check=True),
+             lambda: (data[:split].copy(), data[split:].copy())),
+        ]
+
+        for benchmark_name, function, make_arguments in functions:
+            if name_filter is not None and name_filter not in benchmark_name:
+                continue
+            run_time, peak_memory = measure(function, make_arguments, repeat)
+            results[benchmark_name] = {'time': run_time, 'peak_memory': peak_memory}
+            print('{:<40} {:>10.4f} s {:>12.1f} MB'.format(benchmark_name, run_time, peak_memory / 2. ** 20))
+            sys.stdout.flush()
+
+    return results
+
+
+def compare_results(results, baseline, time_tolerance, memory_tolerance):
+    """Prints the change of every benchmark against the baseline and returns the names of the regressions"""
+    regressions = []
+    print('')
+    print('{:<40} {:>10} {:>10}'.format('benchmark', 'time', 'memory'))
+    for benchmark_name in sorted(results):
+        if benchmark_name not in baseline:
+            continue
+
+        time_ratio = results[benchmark_name]['time'] / max(baseline[benchmark_name]['time'], 1e-9)
+        memory_ratio = (results[benchmark_name]['peak_memory'] /
+                        float(max(baseline[benchmark_name]['peak_memory'], 1)))
+        regressed = time_ratio > 1. + time_tolerance or memory_ratio > 1. + memory_tolerance
+        if regressed:
+            regressions.append(benchmark_name)
+
+        print('{:<40} {:>9.2f}x {:>9.2f}x{}'.format(benchmark_name, time_ratio, memory_ratio,
+                                                    '  REGRESSION' if regressed else ''))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite for autoclean() and autoclean_cv()')
+    parser.add_argument('--save', action='store', dest='SAVE_FILENAME', default=None,
+                        help='JSON file to save the results to, e.g. to use them as a baseline later')
+    parser.add_argument('--compare', action='store', dest='BASELINE_FILENAME', default=None,
+                        help='JSON file with baseline results to compare against')
+    parser.add_argument('--filter', action='store', dest='NAME_FILTER', default=None,
+                        help='Only run the benchmarks whose name contains this string')
+    parser.add_argument('--quick', action='store_true', dest='QUICK', default=False,
+                        help='Use ten times fewer rows in the generated data sets')
+    parser.add_argument('--repeat', action='store', dest='REPEAT', default=3, type=int,
+                        help='Number of timed runs per benchmark; the fastest one is reported (default: 3)')
+    parser.add_argument('--time-tolerance', action='store', dest='TIME_TOLERANCE', default=0.2, type=float,
+                        help='Relative slowdown that counts as a regression (default: 0.2)')
+    parser.add_argument('--memory-tolerance', action='store', dest='MEMORY_TOLERANCE', default=0.1, type=float,
+                        help='Relative increase in peak memory that counts as a regression (default: 0.1)')
+    args = parser.parse_args()
+
+    results = run_suite(args.NAME_FILTER, args.QUICK, args.REPEAT)
+
+    if args.SAVE_FILENAME is not None:
+        with open(args.SAVE_FILENAME, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    if args.BASELINE_FILENAME is not None:
+        with open(args.BASELINE_FILENAME) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_results(results, baseline, args.TIME_TOLERANCE, args.MEMORY_TOLERANCE)
+        if len(regressions) > 0:
+            print('')
+            print('{} benchmark(s) regressed.'.format(len(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -23,22 +23,22 @@ deactivate
 
 # Use the miniconda installer for faster download / install of conda
 # itself
-wget http://repo.continuum.io/miniconda/Miniconda-3.9.1-Linux-x86_64.sh \
+wget https://repo.anaconda.com/miniconda/Miniconda3-latest-Linux-x86_64.sh \
     -O miniconda.sh
 chmod +x miniconda.sh && ./miniconda.sh -b
-export PATH=/home/travis/miniconda/bin:$PATH
+export PATH=/home/travis/miniconda3/bin:$PATH
 conda update --yes conda
 
 # Configure the conda environment and put it in the path using the
 # provided versions
 if [[ "$LATEST" == "true" ]]; then
-    conda create -n testenv --yes python=$PYTHON_VERSION pip nose \
-        numpy scipy scikit-learn cython pandas
+    conda create -n testenv --yes python=$PYTHON_VERSION pip pytest \
+        numpy scipy scikit-learn cython "pandas>=2.0" "joblib>=1.4"
 else
-    conda create -n testenv --yes python=$PYTHON_VERSION pip nose \
+    conda create -n testenv --yes python=$PYTHON_VERSION pip pytest \
         numpy=$NUMPY_VERSION scipy=$SCIPY_VERSION \
         scikit-learn=$SKLEARN_VERSION \
-	      pandas=$PANDAS_VERSION \
+	      pandas=$PANDAS_VERSION joblib=$JOBLIB_VERSION \
         cython
 fi
 
@@ -47,7 +47,7 @@ source activate testenv
 pip install update_checker
 
 if [[ "$COVERAGE" == "true" ]]; then
-    pip install coverage coveralls
+    pip install coverage pytest-cov coveralls
 fi
 
 # build output in the travis output when it succeeds.
@@ -56,5 +56,6 @@ python -c "import numpy; print('numpy %s' % numpy.__version__)"
 python -c "import scipy; print('scipy %s' % scipy.__version__)"
 python -c "import sklearn; print('sklearn %s' % sklearn.__version__)"
 python -c "import pandas; print('pandas %s' % pandas.__version__)"
+python -c "import joblib; print('joblib %s' % joblib.__version__)"
 python -c "import update_checker; print('update_checker %s ' % update_checker.__version__)"
 python setup.py build_ext --inplace
@@ -14,11 +14,12 @@ python -c "import numpy; print('numpy %s' % numpy.__version__)"
 python -c "import scipy; print('scipy %s' % scipy.__version__)"
 python -c "import sklearn; print('sklearn %s' % sklearn.__version__)"
 python -c "import pandas; print('pandas %s' % pandas.__version__)"
+python -c "import joblib; print('joblib %s' % joblib.__version__)"
 python -c "import update_checker; print('update_checker %s ' % update_checker.__version__)"
 
 if [[ "$COVERAGE" == "true" ]]; then
-    nosetests -s -v --with-coverage
+    python -m pytest -s -v --cov=datacleaner tests.py
 else
-    nosetests -s -v
+    python -m pytest -s -v tests.py
 fi
 #make test-doc test-sphinxext
@@ -19,5 +19,22 @@ WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import importlib
+
 from ._version import __version__
-from .datacleaner import autoclean, autoclean_cv, main
+from .batch import autoclean_batch
+from .datacleaner import (autoclean, autoclean_cv, autoclean_chunked, autoclean_splits, downcast_dataframe, main,
+                          write_npy)
+from .partitioned import autoclean_dask, autoclean_partitioned
+from .profiling import Profiler
+
+# These classes need scikit-learn, which is slow to import, so their modules are only imported on first use
+_LAZY_ATTRIBUTES = {'CountEncoder': 'encoders', 'DataCleaner': 'cleaner', 'FactorizeEncoder': 'encoders',
+                    'FrequencyEncoder': 'encoders', 'IncrementalDataCleaner': 'cleaner',
+                    'SparseOneHotEncoder': 'encoders'}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module('.' + _LAZY_ATTRIBUTES[name], __name__), name)
+    raise AttributeError('module {} has no attribute {}'.format(repr(__name__), repr(name)))
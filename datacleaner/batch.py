@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+
+
+from __future__ import print_function
+import glob
+import os
+import time
+
+from .datacleaner import _check_for_updates, _read_data, _write_data, autoclean
+
+
+def _is_glob_pattern(pattern):
+    """Returns True if a file name contains any of the wildcards of a glob pattern"""
+    return any(wildcard in pattern for wildcard in '*?[')
+
+
+def _batch_file_pairs(input_pattern, output_directory=None):
+    """Lists the input and output file names of a batch of data files to clean
+
+    Parameters
+    ----------
+    input_pattern: str
+        Glob pattern of the data files to clean, e.g. 'data/*.csv', or the file name of a manifest that lists
+        one input and one output file name per line, separated by a tab
+    output_directory: str
+        Directory to write the cleaned files matched by a glob pattern to, under their original base names;
+        ignored for a manifest (default: None)
+
+    Returns
+    ----------
+    file_pairs: list
+        (input file name, output file name) pairs, in sorted order for a glob pattern and in the order of the
+        manifest otherwise
+
+    """
+    if _is_glob_pattern(input_pattern):
+        if output_directory is None:
+            raise ValueError('An output directory is needed to clean the files that match a glob pattern.')
+        return [(input_filename, os.path.join(output_directory, os.path.basename(input_filename)))
+                for input_filename in sorted(glob.glob(input_pattern))]
+
+    file_pairs = []
+    with open(input_pattern) as manifest_file:
+        for line_number, line in enumerate(manifest_file, 1):
+            line = line.rstrip('\r\n')
+            if len(line.strip()) == 0:
+                continue
+            filenames = line.split('\t')
+            if len(filenames) != 2:
+                raise ValueError('Line {} of the manifest {} does not hold an input and an output file name '
+                                 'separated by a tab.'.format(line_number, input_pattern))
+            file_pairs.append(tuple(filenames))
+    return file_pairs
+
+
+def _clean_file(input_filename, output_filename, cleaner, drop_nans, input_separator, output_separator,
+                file_format, columns, coerce_threshold):
+    """Reads, cleans, and writes a single data file of a batch
+
+    Returns
+    ----------
+    input_filename: str
+        File name of the data file
+    output_filename: str
+        File name of the cleaned data file
+    seconds: float
+        Wall time taken to clean the file
+    error: Exception
+        The error that stopped the file from being cleaned, or None if it was cleaned
+
+    """
+    start_time = time.time()
+    try:
+        input_dataframe = _read_data(input_filename, sep=input_separator, file_format=file_format, columns=columns)
+        if cleaner is None:
+            output_dataframe = autoclean(input_dataframe, drop_nans=drop_nans, ignore_update_check=True,
+                                         coerce_threshold=coerce_threshold)
+        else:
+            if drop_nans:
+                input_dataframe = input_dataframe.dropna()
+            output_dataframe = cleaner.transform(input_dataframe)
+        del input_dataframe
+
+        output_directory = os.path.dirname(output_filename)
+        if output_directory and not os.path.isdir(output_directory):
+            os.makedirs(output_directory, exist_ok=True)
+        _write_data(output_dataframe, output_filename, sep=output_separator, file_format=file_format)
+    except Exception as error:
+        return input_filename, output_filename, time.time() - start_time, error
+    return input_filename, output_filename, time.time() - start_time, None
+
+
+def autoclean_batch(file_pairs, cleaner=None, n_jobs=4, drop_nans=False, input_separator='\t',
+                    output_separator='\t', file_format=None, columns=None, ignore_update_check=False,
+                    coerce_threshold=None, callback=None):
+    """Cleans a batch of data files, overlapping the reading, cleaning, and writing of different files
+
+    Every file is read, cleaned, and written by one of `n_jobs` worker threads, so that some workers wait on
+    the disk while others clean. At most `n_jobs` files are held in memory at a time. A file that cannot be
+    read, cleaned, or written is reported and skipped; it does not stop the rest of the batch.
+
+    Parameters
+    ----------
+    file_pairs: list
+        (input file name, output file name) pairs of the data files to clean; e.g. every file that matches a glob pattern
+    cleaner: datacleaner.DataCleaner
+        Fitted DataCleaner that applies the same transformations to every file; if None, every file is cleaned
+        with `autoclean()` on its own (default: None)
+    n_jobs: int
+        Number of files to clean at the same time (default: 4)
+    drop_nans: bool
+        Drop all rows that have a NaN in any column (default: False)
+    input_separator: str
+        Column separator of the input files if they are delimited text (default: \\t)
+    output_separator: str
+        Column separator of the output files if they are delimited text (default: \\t)
+    file_format: str
+        'csv', 'parquet', or 'feather'; inferred from every file extension if None (default: None)
+    columns: list
+        Only read these columns from the input files (default: None)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    coerce_threshold: float
+        Without a `cleaner`, convert the text columns of every file that are mostly numbers (or else dates);
+        see `autoclean()` (default: None)
+    callback: callable
+        Called with the input file name, the output file name, the wall time in seconds, and the error (or None)
+        of every file as soon as it is done, in the order that the files finish (default: None)
+
+    Returns
+    ----------
+    errors: dict
+        Maps the input file name of every file that could not be cleaned to its error
+
+    """
+    _check_for_updates(ignore_update_check)
+
+    from joblib import Parallel, delayed
+    errors = {}
+    results = Parallel(n_jobs=n_jobs, prefer='threads', return_as='generator_unordered')(
+        delayed(_clean_file)(input_filename, output_filename, cleaner, drop_nans, input_separator, output_separator,
+                             file_format, columns, coerce_threshold)
+        for input_filename, output_filename in file_pairs)
+    for input_filename, output_filename, seconds, error in results:
+        if error is not None:
+            errors[input_filename] = error
+        if callback is not None:
+            callback(input_filename, output_filename, seconds, error)
+
+    return errors
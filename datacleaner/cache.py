@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import print_function
+import hashlib
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+from ._version import __version__
+
+_CACHE_FILE_EXTENSION = '.pkl'
+
+
+class FitCache(object):
+    """Stores fitted data cleaning parameters on disk, keyed by a fingerprint of the training data and options
+
+    The fingerprint hashes the column names, the dtypes, and the contents of every row with
+    `pandas.util.hash_pandas_object()`, which is much faster than computing the medians, modes, and encoders.
+    The cache holds at most `max_bytes` of files; when it grows beyond that, the least recently used entries
+    are removed first. Entries are written atomically, so several processes can share a cache directory.
+
+    Parameters
+    ----------
+    cache_dir: str
+        Directory to store the cached parameters in; it is created if it does not exist
+    max_bytes: int
+        Largest total size of the cached files in bytes (default: 1 GB)
+
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 ** 30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, input_dataframe, options):
+        """Returns the cache key of a training data set and the options that the fitted parameters depend on
+
+        Parameters
+        ----------
+        input_dataframe: pandas.DataFrame
+            Training data set
+        options: dict
+            Options that change the fitted parameters; their values must have a stable `repr()`
+
+        Returns
+        ----------
+        key: str
+            Hexadecimal digest that identifies the fitted parameters
+
+        """
+        fingerprint = hashlib.sha256()
+        fingerprint.update(repr((__version__, sorted(options.items()))).encode('utf-8'))
+        fingerprint.update(repr([(column, str(dtype)) for column, dtype in input_dataframe.dtypes.items()])
+                           .encode('utf-8'))
+        fingerprint.update(pd.util.hash_pandas_object(input_dataframe, index=False).values.tobytes())
+        return fingerprint.hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.cache_dir, key + _CACHE_FILE_EXTENSION)
+
+    def load(self, key):
+        """Returns the parameters stored under `key`, or None if there are none"""
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as input_file:
+                parameters = pickle.load(input_file)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # The modification time records when an entry was last used
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return parameters
+
+    def save(self, key, parameters):
+        """Stores the parameters under `key` and evicts the least recently used entries if the cache is too large"""
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        file_descriptor, temp_filename = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as output_file:
+            pickle.dump(parameters, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filename, self._filename(key))
+
+        self._evict()
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache holds at most `max_bytes`"""
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(_CACHE_FILE_EXTENSION):
+                try:
+                    file_stat = os.stat(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    continue
+                entries.append((file_stat.st_mtime, file_stat.st_size, filename))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except OSError:
+                pass
+            total_bytes -= size
@@ -0,0 +1,630 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import print_function
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+from .cache import FitCache
+from .compiled import _RAISE, CompiledCleaner
+from .datacleaner import (_build_lookup_table, _check_for_updates, _coerce_columns, _coercible_columns,
+                          _columns_with_nans, _encode_columns, _encode_frame, _encodes_frame, _fill_nans, _fit_columns,
+                          _merge_dtypes, _mode_from_counts, _object_columns, _stage)
+
+
+# Attributes that `fit()` learns, which are all that a fit cache has to store
+_FITTED_ATTRIBUTES = ['columns_', 'coerced_columns_', 'fill_values_', 'fill_errors_', 'encoders_', 'frame_encoder_',
+                      'lookup_tables_']
+
+
+class DataCleaner(BaseEstimator, TransformerMixin):
+    """Learns the data cleaning transformations from a training data set so they can be applied to other data sets
+
+    This is the fitted counterpart of `autoclean_cv()`: `fit()` learns the median or mode of every column and an
+    encoder for every categorical column from the training data set, and `transform()` applies those precomputed
+    transformations to any data set with the same columns. Because it is a scikit-learn transformer, a DataCleaner
+    can be used inside scikit-learn Pipelines. Fitted DataCleaners can be pickled or saved with `save()`.
+
+    Parameters
+    ----------
+    copy: bool
+        Make a copy of the data set before transforming it (default: True)
+    encoder: category_encoders transformer
+        The a valid category_encoders transformer which is passed an inferred cols list. Default (None: LabelEncoder)
+    encoder_kwargs: category_encoders
+        The a valid sklearn transformer to encode categorical features. Default (None)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    n_jobs: int
+        Number of parallel jobs to fit and encode the columns with; -1 uses all CPU cores (default: 1)
+    handle_unknown: str
+        What to do with categories that were not in the training data set: 'error' raises an error,
+        'unknown' encodes them as -1, and 'mode' encodes them like the most frequent training category.
+        Unless it is 'error', the categorical columns are encoded with precomputed lookup tables instead
+        of the encoders (default: 'error')
+    approximate_error: float
+        Estimate the medians and modes with mergeable sketches instead of computing them exactly. The rank
+        error of every median and the frequency error of every mode is at most this fraction of the rows
+        (default: None)
+    cache_dir: str or datacleaner.cache.FitCache
+        Directory of an on-disk cache for the fitted parameters. Fitting on a training data set with the same
+        columns, dtypes, and values as a cached one, and with the same options, loads the cached parameters
+        instead of computing them. Pass a FitCache to change the size limit of the cache (default: None)
+    coerce_threshold: float
+        Convert object columns to numbers (or else dates) if at least this fraction of a sample of their training
+        values parses as such. Values that do not parse are replaced like NaNs, and the converted columns get the
+        median instead of being encoded (default: None)
+
+    Attributes
+    ----------
+    columns_: list
+        Columns of the training data set
+    coerced_columns_: dict
+        Maps each column that is converted before cleaning to 'numeric' or 'datetime'
+    fill_values_: dict
+        Maps each column to the value that replaces its NaNs
+    fill_errors_: dict
+        Maps each column to the achieved error of its estimated fill value; empty without `approximate_error`
+    encoders_: dict
+        Maps each categorical column to its fitted encoder; empty for encoders of whole DataFrames
+    frame_encoder_: datacleaner.encoders._FrameEncoder
+        Fitted encoder of all categorical columns if `encoder` encodes whole DataFrames (e.g. CountEncoder,
+        FrequencyEncoder, or SparseOneHotEncoder), otherwise None
+    lookup_tables_: dict
+        Maps each categorical column to its `_build_lookup_table()` result, unless `handle_unknown` is 'error'
+
+    """
+
+    def __init__(self, copy=True, encoder=None, encoder_kwargs=None, ignore_update_check=False, n_jobs=1,
+                 handle_unknown='error', approximate_error=None, cache_dir=None, coerce_threshold=None):
+        self.copy = copy
+        self.encoder = encoder
+        self.encoder_kwargs = encoder_kwargs
+        self.ignore_update_check = ignore_update_check
+        self.n_jobs = n_jobs
+        self.handle_unknown = handle_unknown
+        self.approximate_error = approximate_error
+        self.cache_dir = cache_dir
+        self.coerce_threshold = coerce_threshold
+
+    def fit(self, X, y=None, profiler=None):
+        """Learns the NaN replacement values and categorical encoders from the training data set
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Training data set
+        y: None
+            Ignored
+        profiler: datacleaner.Profiler
+            Records the wall time and memory use of every fitting stage (default: None)
+
+        Returns
+        ----------
+        self: DataCleaner
+            The fitted DataCleaner
+
+        """
+        _check_for_updates(self.ignore_update_check)
+
+        if self.handle_unknown not in ('error', 'unknown', 'mode'):
+            raise ValueError('handle_unknown must be one of \'error\', \'unknown\', or \'mode\', '
+                             'not {}.'.format(repr(self.handle_unknown)))
+
+        encoder_kwargs = self.encoder_kwargs
+        if encoder_kwargs is None:
+            encoder_kwargs = {}
+
+        cache = self.cache_dir
+        if cache is not None:
+            if not isinstance(cache, FitCache):
+                cache = FitCache(cache)
+            with _stage(profiler, 'cache_lookup', rows=len(X)):
+                cache_key = cache.key(X, self._fit_options(encoder_kwargs))
+                fitted_attributes = cache.load(cache_key)
+            if fitted_attributes is not None:
+                self.__dict__.update(fitted_attributes)
+                return self
+
+        self.columns_ = list(X.columns.values)
+        self.coerced_columns_ = {}
+        if self.coerce_threshold is not None:
+            with _stage(profiler, 'find_coercible', rows=len(X)):
+                self.coerced_columns_ = _coercible_columns(X, self.coerce_threshold)
+            if len(self.coerced_columns_) > 0:
+                X = X.copy(deep=False)
+                _coerce_columns(X, self.coerced_columns_, profiler)
+
+        # Replace NaNs with the median or mode of the column depending on the column type,
+        # then encode all strings with numerical equivalents
+        self.fill_values_, _, self.fill_errors_, self.encoders_, _ = _fit_columns(
+            X, self.columns_, self.encoder, encoder_kwargs, fill_from_neighbors=False, return_encoded=False,
+            n_jobs=self.n_jobs, profiler=profiler, approximate_error=self.approximate_error)
+
+        self.frame_encoder_ = None
+        if _encodes_frame(self.encoder):
+            # Unless the encoder is told otherwise, it handles unknown categories like the DataCleaner would
+            frame_encoder_kwargs = dict(encoder_kwargs)
+            frame_encoder_kwargs.setdefault('handle_unknown',
+                                            'value' if self.handle_unknown == 'unknown' else self.handle_unknown)
+            object_columns = _object_columns(X)
+            with _stage(profiler, 'fill_nans', object_columns, len(X)):
+                object_values = X[object_columns].fillna(dict((column, self.fill_values_[column])
+                                                              for column in object_columns
+                                                              if column in self.fill_values_))
+            with _stage(profiler, 'encoder_fit', object_columns, len(X)):
+                self.frame_encoder_ = self.encoder(**frame_encoder_kwargs).fit(object_values)
+
+        self.lookup_tables_ = {}
+        if self.handle_unknown != 'error':
+            for column, column_encoder in self.encoders_.items():
+                categories = getattr(column_encoder, 'classes_', None)
+                if categories is None:
+                    categories = X[column].fillna(self.fill_values_.get(column)).unique()
+                with _stage(profiler, 'lookup_table', [column]):
+                    self.lookup_tables_[column] = _build_lookup_table(column_encoder, categories,
+                                                                      self.fill_values_.get(column),
+                                                                      self.handle_unknown)
+
+        if cache is not None:
+            cache.save(cache_key, dict((name, getattr(self, name)) for name in _FITTED_ATTRIBUTES))
+
+        return self
+
+    def _fit_options(self, encoder_kwargs):
+        """Returns the parameters that change the fitted attributes, in a form with a stable `repr()`"""
+        encoder_name = None
+        if self.encoder is not None:
+            encoder_name = '{}.{}'.format(self.encoder.__module__, self.encoder.__name__)
+        return {'encoder': encoder_name, 'encoder_kwargs': sorted(encoder_kwargs.items()),
+                'handle_unknown': self.handle_unknown, 'approximate_error': self.approximate_error,
+                'coerce_threshold': self.coerce_threshold}
+
+    def transform(self, X, profiler=None):
+        """Applies the learned NaN replacement values and categorical encoders to a data set
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Data set to clean, which must have the same columns as the training data set
+        profiler: datacleaner.Profiler
+            Records the wall time and memory use of every cleaning stage (default: None)
+
+        Returns
+        ----------
+        output_dataframe: pandas.DataFrame
+            Cleaned data set
+
+        """
+        return self.transform_many([X], profiler)[0]
+
+    def transform_many(self, Xs, profiler=None):
+        """Applies the learned NaN replacement values and categorical encoders to several data sets at once
+
+        The NaNs of every data set are replaced separately, but each categorical column is encoded for all
+        data sets together with a single call of its encoder, e.g. for all validation folds of a k-fold split.
+
+        Parameters
+        ----------
+        Xs: list
+            Data sets (pandas.DataFrame) to clean, which must all have the same columns as the training data set
+        profiler: datacleaner.Profiler
+            Records the wall time and memory use of every cleaning stage (default: None)
+
+        Returns
+        ----------
+        output_dataframes: list
+            Cleaned data sets, in the same order as `Xs`
+
+        """
+        check_is_fitted(self, 'fill_values_')
+
+        for X in Xs:
+            if set(X.columns.values) != set(self.columns_):
+                raise ValueError('The DataFrame does not have the same columns as the training DataFrame. '
+                                 'Make sure that you are providing the same columns.')
+
+        if self.copy:
+            with _stage(profiler, 'copy', rows=sum(len(X) for X in Xs)):
+                Xs = [X.copy() for X in Xs]
+
+        for X in Xs:
+            _coerce_columns(X, self.coerced_columns_, profiler)
+            with _stage(profiler, 'find_nans', rows=len(X)):
+                nan_columns = _columns_with_nans(X)
+            _fill_nans(X, dict((column, self.fill_values_[column]) for column in nan_columns
+                               if column in self.fill_values_), profiler)
+
+        frame_encoder = getattr(self, 'frame_encoder_', None)
+        if frame_encoder is not None:
+            return [_encode_frame(X, frame_encoder, frame_encoder.columns_, profiler=profiler) for X in Xs]
+
+        if len(Xs) == 1:
+            self._encode(Xs[0], profiler)
+            return list(Xs)
+
+        encoded_columns = [column for column in self.columns_ if column in self.encoders_]
+        if len(encoded_columns) > 0:
+            combined_dataframe = pd.concat([X[encoded_columns] for X in Xs], ignore_index=True)
+            self._encode(combined_dataframe, profiler)
+            start = 0
+            for X in Xs:
+                for column in encoded_columns:
+                    X[column] = combined_dataframe[column].iloc[start:start + len(X)].values
+                start += len(X)
+
+        return list(Xs)
+
+    def _encode(self, X, profiler=None):
+        """Encodes the categorical columns of a data set in place, with the encoders or the lookup tables"""
+        if self.handle_unknown == 'error':
+            _encode_columns(X, self.encoders_, self.n_jobs, profiler)
+        else:
+            for column, (category_index, codes, output_categories) in self.lookup_tables_.items():
+                with _stage(profiler, 'encode', [column], len(X)):
+                    encoded_values = codes[category_index.get_indexer(X[column].values)]
+                    if output_categories is not None:
+                        encoded_values = pd.Categorical.from_codes(encoded_values, categories=output_categories)
+                    X[column] = encoded_values
+
+    def compile(self):
+        """Compiles the fitted cleaning state into a CompiledCleaner that cleans single records in microseconds
+
+        Returns
+        ----------
+        compiled_cleaner: datacleaner.compiled.CompiledCleaner
+            Cleans dicts that map every column to its value with the same transformations as `transform()`
+
+        """
+        check_is_fitted(self, 'fill_values_')
+
+        if getattr(self, 'frame_encoder_', None) is not None:
+            raise ValueError('DataCleaners with an encoder of whole DataFrames cannot be compiled.')
+
+        encodings = {}
+        for column, column_encoder in self.encoders_.items():
+            if column in self.lookup_tables_:
+                category_index, codes, output_categories = self.lookup_tables_[column]
+            else:
+                categories = getattr(column_encoder, 'classes_', None)
+                if categories is None:
+                    raise ValueError('The encoder of the column {} has no classes_, so it can only be compiled with '
+                                     'handle_unknown \'unknown\' or \'mode\'.'.format(repr(column)))
+                category_index, codes, output_categories = _build_lookup_table(column_encoder, categories, None,
+                                                                               'unknown')
+
+            encoded_values = codes.tolist()
+            if output_categories is not None:
+                encoded_values = [output_categories[code] if code >= 0 else None for code in encoded_values]
+            unknown_code = encoded_values[-1] if self.handle_unknown != 'error' else _RAISE
+            encodings[column] = (dict(zip(category_index.tolist(), encoded_values[:-1])), unknown_code)
+
+        return CompiledCleaner(self.columns_, self.fill_values_, getattr(self, 'coerced_columns_', {}), encodings)
+
+    def save(self, filename):
+        """Saves the fitted DataCleaner to a file
+
+        Parameters
+        ----------
+        filename: str
+            File name to save the DataCleaner to
+
+        Returns
+        ----------
+        None
+
+        """
+        with open(filename, 'wb') as output_file:
+            pickle.dump(self, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(filename):
+        """Loads a DataCleaner that was saved with `save()`
+
+        Parameters
+        ----------
+        filename: str
+            File name to load the DataCleaner from
+
+        Returns
+        ----------
+        cleaner: DataCleaner
+            The loaded DataCleaner
+
+        """
+        with open(filename, 'rb') as input_file:
+            return pickle.load(input_file)
+
+
+def _update_category_counts(categories, counts, values):
+    """Adds the values of a batch to the counts of a column's categories
+
+    Categories that were not seen before are appended to the end, so every category keeps its position. Only
+    the categories in the batch are looked up, so the update takes time proportional to the size of the batch,
+    plus a copy of the categories whenever new ones are appended.
+
+    Parameters
+    ----------
+    categories: pandas.Index
+        Categories of the column in the order in which they were first seen, or None for the first batch
+    counts: numpy.ndarray
+        Number of times each category was seen, or None for the first batch
+    values: numpy.ndarray
+        Values of the column in the batch
+
+    Returns
+    ----------
+    categories: pandas.Index
+        Updated categories
+    counts: numpy.ndarray
+        Updated counts
+
+    """
+    batch_counts = pd.Series(values).value_counts(dropna=True, sort=False)
+    if categories is None:
+        return batch_counts.index, batch_counts.to_numpy(dtype=np.int64, copy=True)
+
+    positions = categories.get_indexer(batch_counts.index)
+    known = positions >= 0
+    counts[positions[known]] += batch_counts.values[known]
+    if not known.all():
+        categories = categories.append(batch_counts.index[~known])
+        counts = np.concatenate([counts, batch_counts.values[~known].astype(np.int64)])
+    return categories, counts
+
+
+class IncrementalDataCleaner(DataCleaner):
+    """Learns the data cleaning transformations from a training data set that arrives in batches
+
+    `partial_fit()` updates the cleaning statistics with a new batch of training data without revisiting the
+    earlier batches: the medians of numerical columns are tracked with a mergeable QuantileSketch, and the
+    modes of all other columns with counts of their categories. String columns are encoded by the position of
+    each category in the order in which the categories were first seen, so categories that appear in later
+    batches get new codes while all earlier codes keep their meaning. The codes therefore differ from the sorted
+    codes of LabelEncoder. A fitted IncrementalDataCleaner can be pickled or saved with `save()` and updated
+    with the next batch after loading it.
+
+    Parameters
+    ----------
+    copy: bool
+        Make a copy of the data set before transforming it (default: True)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    handle_unknown: str
+        What to do with categories that were not in any training batch: 'error' raises an error,
+        'unknown' encodes them as -1, and 'mode' encodes them like the most frequent training category
+        (default: 'unknown')
+    quantile_error: float
+        Largest rank error of the medians as a fraction of the number of values; the medians are exact until a
+        column has more than about `1 / quantile_error` values (default: 0.001)
+
+    Attributes
+    ----------
+    columns_: list
+        Columns of the training data set
+    dtypes_: dict
+        Maps each column to the dtype that it would have if all batches were concatenated
+    n_samples_seen_: int
+        Number of rows in all training batches
+    quantile_sketches_: dict
+        Maps each numerical column to the QuantileSketch of its values
+    categories_: dict
+        Maps each non-numerical column to a pandas.Index of its categories, in the order in which they were
+        first seen; the position of a category is its code
+    category_counts_: dict
+        Maps each non-numerical column to the number of times each of its categories was seen
+
+    """
+
+    def __init__(self, copy=True, ignore_update_check=False, handle_unknown='unknown', quantile_error=0.001):
+        self.copy = copy
+        self.ignore_update_check = ignore_update_check
+        self.handle_unknown = handle_unknown
+        self.quantile_error = quantile_error
+
+    def fit(self, X, y=None, profiler=None):
+        """Learns the cleaning statistics from a training data set, discarding those of earlier batches
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Training data set
+        y: None
+            Ignored
+        profiler: datacleaner.Profiler
+            Records the wall time and memory use of every fitting stage (default: None)
+
+        Returns
+        ----------
+        self: IncrementalDataCleaner
+            The fitted IncrementalDataCleaner
+
+        """
+        for name in ['columns_', 'dtypes_', 'n_samples_seen_', 'quantile_sketches_', 'categories_',
+                     'category_counts_']:
+            self.__dict__.pop(name, None)
+        return self.partial_fit(X, profiler=profiler)
+
+    def partial_fit(self, X, y=None, profiler=None):
+        """Updates the cleaning statistics with a new batch of training data
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Batch of training data, which must have the same columns as the earlier batches
+        y: None
+            Ignored
+        profiler: datacleaner.Profiler
+            Records the wall time and memory use of updating every column (default: None)
+
+        Returns
+        ----------
+        self: IncrementalDataCleaner
+            The updated IncrementalDataCleaner
+
+        """
+        _check_for_updates(self.ignore_update_check)
+
+        if self.handle_unknown not in ('error', 'unknown', 'mode'):
+            raise ValueError('handle_unknown must be one of \'error\', \'unknown\', or \'mode\', '
+                             'not {}.'.format(repr(self.handle_unknown)))
+
+        first_batch = not hasattr(self, 'columns_')
+        if not first_batch and set(X.columns.values) != set(self.columns_):
+            raise ValueError('The DataFrame does not have the same columns as the earlier training DataFrames. '
+                             'Make sure that you are providing the same columns.')
+
+        # Check the dtypes of all columns before updating any statistics, so that a batch that is rejected
+        # leaves the cleaner as it was
+        columns = list(X.columns.values) if first_batch else self.columns_
+        earlier_dtypes = {} if first_batch else self.dtypes_
+        dtypes = {}
+        for column in columns:
+            dtype = X[column].dtype
+            if column in earlier_dtypes:
+                dtype = _merge_dtypes(earlier_dtypes[column], dtype)
+                if (earlier_dtypes[column].kind in 'biufc') != (dtype.kind in 'biufc'):
+                    raise ValueError('The column {} holds numbers in some training batches and other values in '
+                                     'others. Make sure that every column has the same type in every '
+                                     'batch.'.format(repr(column)))
+            dtypes[column] = dtype
+
+        if first_batch:
+            self.columns_ = columns
+            self.dtypes_ = {}
+            self.n_samples_seen_ = 0
+            self.quantile_sketches_ = {}
+            self.categories_ = {}
+            self.category_counts_ = {}
+        self.dtypes_.update(dtypes)
+
+        from .sketches import QuantileSketch
+        for column in self.columns_:
+            column_values = X[column]
+            dtype = dtypes[column]
+            with _stage(profiler, 'partial_fit', [column], len(X)):
+                if dtype.kind in 'biufc':
+                    if column not in self.quantile_sketches_:
+                        self.quantile_sketches_[column] = QuantileSketch(self.quantile_error)
+                    self.quantile_sketches_[column].update(column_values.to_numpy(dtype=np.float64,
+                                                                                  na_value=np.nan))
+                else:
+                    self.categories_[column], self.category_counts_[column] = _update_category_counts(
+                        self.categories_.get(column), self.category_counts_.get(column), column_values.values)
+
+        self.n_samples_seen_ += len(X)
+        self._fill_values = None
+        return self
+
+    def _get_fill_values(self):
+        """Returns the current median or mode of every column, computing them only once per training batch"""
+        if getattr(self, '_fill_values', None) is None:
+            fill_values = {}
+            for column, quantile_sketch in self.quantile_sketches_.items():
+                fill_values[column] = quantile_sketch.median()
+            for column, categories in self.categories_.items():
+                if len(categories) > 0:
+                    fill_values[column] = _mode_from_counts(pd.Series(self.category_counts_[column],
+                                                                      index=categories))
+            self._fill_values = fill_values
+        return self._fill_values
+
+    @property
+    def fill_values_(self):
+        """Maps each column to the value that replaces its NaNs"""
+        check_is_fitted(self, 'categories_')
+        return self._get_fill_values()
+
+    def compile(self):
+        """Compiles the current cleaning statistics into a CompiledCleaner; see `DataCleaner.compile()`"""
+        check_is_fitted(self, 'categories_')
+
+        fill_values = self._get_fill_values()
+        encodings = {}
+        for column, categories in self.categories_.items():
+            if self.dtypes_[column] != np.dtype('object'):
+                continue
+
+            unknown_code = -1
+            if self.handle_unknown == 'error':
+                unknown_code = _RAISE
+            elif self.handle_unknown == 'mode' and column in fill_values:
+                unknown_code = categories.get_loc(fill_values[column])
+            encodings[column] = (dict(zip(categories.tolist(), range(len(categories)))), unknown_code)
+
+        return CompiledCleaner(self.columns_, fill_values, {}, encodings)
+
+    def transform_many(self, Xs, profiler=None):
+        """Applies the current cleaning statistics to several data sets; see `transform()`"""
+        return [self.transform(X, profiler) for X in Xs]
+
+    def transform(self, X, profiler=None):
+        """Applies the current cleaning statistics to a data set
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Data set to clean, which must have the same columns as the training data set
+        profiler: datacleaner.Profiler
+            Records the wall time and memory use of every cleaning stage (default: None)
+
+        Returns
+        ----------
+        output_dataframe: pandas.DataFrame
+            Cleaned data set
+
+        """
+        check_is_fitted(self, 'categories_')
+
+        if set(X.columns.values) != set(self.columns_):
+            raise ValueError('The DataFrame does not have the same columns as the training DataFrame. '
+                             'Make sure that you are providing the same columns.')
+
+        if self.copy:
+            with _stage(profiler, 'copy', rows=len(X)):
+                X = X.copy()
+
+        fill_values = self._get_fill_values()
+        with _stage(profiler, 'find_nans', rows=len(X)):
+            nan_columns = _columns_with_nans(X)
+        _fill_nans(X, dict((column, fill_values[column]) for column in nan_columns if column in fill_values),
+                   profiler)
+
+        for column, categories in self.categories_.items():
+            if self.dtypes_[column] != np.dtype('object'):
+                continue
+
+            with _stage(profiler, 'encode', [column], len(X)):
+                codes = categories.get_indexer(X[column].values)
+                unknown = codes < 0
+                if unknown.any():
+                    if self.handle_unknown == 'error':
+                        raise ValueError('The column {} has categories that were not in any training batch: '
+                                         '{}'.format(repr(column), list(pd.unique(X[column].values[unknown]))[:10]))
+                    if self.handle_unknown == 'mode' and column in fill_values:
+                        codes[unknown] = categories.get_loc(fill_values[column])
+                X[column] = codes
+
+        return X
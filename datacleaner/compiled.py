@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+
+
+from __future__ import print_function
+
+import numpy as np
+import pandas as pd
+
+from .datacleaner import _RELATIVE_DATE_WORDS
+
+# Code of categories that were not in the training data set when they are to be reported as an error
+_RAISE = object()
+
+
+def _python_value(value):
+    """Converts NumPy scalars to the equivalent Python scalars, which are faster to hash and compare"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _to_number(value):
+    """Parses a string as a number like `pandas.to_numeric`, returning None if it is not a number"""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _to_datetime(value):
+    """Parses a value as a date like `pandas.to_datetime`, returning None if it is not a date"""
+    if isinstance(value, str) and value.strip().lower() in _RELATIVE_DATE_WORDS:
+        return None
+    try:
+        return pd.Timestamp(value)
+    except (ValueError, TypeError):
+        return None
+
+
+_COERCE_FUNCTIONS = {'numeric': _to_number, 'datetime': _to_datetime}
+
+
+class CompiledCleaner(object):
+    """Applies the fitted cleaning state of a DataCleaner to single records with plain dict operations
+
+    A DataCleaner cleans whole DataFrames, so cleaning a single record with it pays for building a DataFrame and
+    for every vectorized operation and encoder call, which together take milliseconds. A CompiledCleaner keeps
+    the fill value and a dict from category to code for every column and cleans a record, a dict that maps
+    every column to its value, in a few microseconds. Create one with `DataCleaner.compile()`.
+
+    The cleaned records hold Python scalars, so their numbers can differ in type (but not in value) from the
+    columns of `DataCleaner.transform()`, e.g. an integer column that had NaNs becomes a float column there.
+
+    Parameters
+    ----------
+    columns: list
+        Columns of the training data set
+    fill_values: dict
+        Maps each column to the value that replaces its NaNs
+    coerced_columns: dict
+        Maps each column that is converted before cleaning to 'numeric' or 'datetime'
+    encodings: dict
+        Maps each categorical column to a (dict from category to code, code of unknown categories) pair, where
+        the code of unknown categories is `_RAISE` to raise an error instead
+
+    """
+
+    def __init__(self, columns, fill_values, coerced_columns, encodings):
+        self.columns = list(columns)
+        self._steps = []
+        for column in self.columns:
+            fill_value = _python_value(fill_values[column]) if column in fill_values else None
+            codes, unknown_code = encodings.get(column, (None, None))
+            self._steps.append((column, _COERCE_FUNCTIONS.get(coerced_columns.get(column)), fill_value, codes,
+                                unknown_code))
+
+    def transform(self, records):
+        """Cleans a single record or a list of records
+
+        Parameters
+        ----------
+        records: dict or list
+            A record that maps every column of the training data set to its value, or a list of such records
+
+        Returns
+        ----------
+        cleaned_records: dict or list
+            The cleaned record, or a list of the cleaned records in the same order
+
+        """
+        if isinstance(records, dict):
+            return self.transform_record(records)
+        return [self.transform_record(record) for record in records]
+
+    def transform_record(self, record):
+        """Cleans a single record that maps every column of the training data set to its value"""
+        cleaned_record = {}
+        try:
+            for column, coerce, fill_value, codes, unknown_code in self._steps:
+                value = record[column]
+                if coerce is not None:
+                    value = coerce(value)
+                if value is None or value is pd.NA or value != value:
+                    value = fill_value
+                if codes is not None:
+                    code = codes.get(value, unknown_code)
+                    if code is _RAISE:
+                        raise ValueError('The column {} has a category that was not in the training data set: '
+                                         '{}'.format(repr(column), repr(value)))
+                    value = code
+                cleaned_record[column] = value
+        except KeyError as error:
+            raise ValueError('The record does not have the column {} of the training DataFrame. '
+                             'Make sure that you are providing the same columns.'.format(error))
+        return cleaned_record
@@ -20,17 +20,686 @@ SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 from __future__ import print_function
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
 import argparse
-from update_checker import update_check
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import warnings
 
 from ._version import __version__
 
 update_checked = False
 
+# The update check runs in the background and is done at most once per _UPDATE_CHECK_INTERVAL seconds;
+# at exit, the interpreter waits at most _UPDATE_CHECK_TIMEOUT seconds for a check that is still running
+_UPDATE_CHECK_INTERVAL = 24 * 60 * 60
+_UPDATE_CHECK_TIMEOUT = 1.
+
+
+def _update_check_cache_filename():
+    """Returns the file name of the on-disk cache that records when the last update check ran"""
+    cache_directory = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_directory, 'datacleaner', 'update_check.json')
+
+
+def _update_check_is_due():
+    """Records the current time in the update check cache and returns whether the last check is stale"""
+    cache_filename = _update_check_cache_filename()
+    now = time.time()
+    try:
+        with open(cache_filename) as cache_file:
+            if now - json.load(cache_file)['last_check'] < _UPDATE_CHECK_INTERVAL:
+                return False
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        if not os.path.isdir(os.path.dirname(cache_filename)):
+            os.makedirs(os.path.dirname(cache_filename))
+        with open(cache_filename, 'w') as cache_file:
+            json.dump({'last_check': now}, cache_file)
+    except (IOError, OSError):
+        pass
+
+    return True
+
+
+def _run_update_check():
+    """Checks PyPI for a newer version of datacleaner, never raising an error"""
+    try:
+        if _update_check_is_due():
+            from update_checker import update_check
+            update_check('datacleaner', __version__)
+    except Exception:
+        pass
+
+
+def _check_for_updates(ignore_update_check):
+    """Starts the check for the latest version of datacleaner in the background, once per process
+
+    Parameters
+    ----------
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+
+    Returns
+    ----------
+    None
+
+    """
+    global update_checked
+    if ignore_update_check:
+        update_checked = True
+
+    if update_checked:
+        return
+    update_checked = True
+
+    update_check_thread = threading.Thread(target=_run_update_check)
+    update_check_thread.daemon = True
+    update_check_thread.start()
+    atexit.register(update_check_thread.join, _UPDATE_CHECK_TIMEOUT)
+
+# Stand-in for `Profiler.stage()` when no Profiler is given, so that unprofiled runs do no bookkeeping
+_NO_PROFILING = contextlib.nullcontext()
+
+
+def _stage(profiler, name, columns=None, rows=None):
+    """Returns a context manager that records a cleaning stage with the Profiler, if there is one"""
+    if profiler is None:
+        return _NO_PROFILING
+    return profiler.stage(name, columns, rows)
+
+# Upper bound on the size of the temporary copies made while imputing NaNs, so that cleaning a data set
+# in place never needs more than a fixed amount of extra memory
+_BATCH_BYTES = 32 * 2 ** 20
+
+def _column_batches(input_dataframe, columns):
+    """Splits the columns into batches whose values take up at most about `_BATCH_BYTES`"""
+    column_bytes = max(1, len(input_dataframe) * 8)
+    batch_size = max(1, _BATCH_BYTES // column_bytes)
+    return [columns[i:i + batch_size] for i in range(0, len(columns), batch_size)]
+
+
+def _approximate_fill_value(column_values, approximate_error, median):
+    """Estimates the median or the mode of a column with a mergeable sketch
+
+    The column is added to the sketch in blocks of at most `_BATCH_BYTES`, so the extra memory needed does not
+    grow with the length of the column. Datetime and timedelta columns are sketched as integer offsets from the
+    epoch, and their median is converted back to the dtype of the column.
+
+    Parameters
+    ----------
+    column_values: pandas.Series
+        Column to estimate the fill value of
+    approximate_error: float
+        Largest rank or frequency error of the sketch, as a fraction of the number of values
+    median: bool
+        Estimate the median instead of the mode, for the columns that `_classify_columns()` replaces with
+        their median
+
+    Returns
+    ----------
+    fill_value: object
+        Estimated median or mode of the column, or None if the column has no mode
+    achieved_error: float
+        Largest rank error of the median or frequency error of the mode, as a fraction of the number of values
+
+    """
+    from .sketches import FrequencySketch, QuantileSketch
+
+    block_size = max(1, _BATCH_BYTES // 8)
+    if median:
+        datetime_like = column_values.dtype.kind in 'Mm'
+        sketch = QuantileSketch(approximate_error)
+        for start in range(0, len(column_values), block_size):
+            block = column_values.iloc[start:start + block_size]
+            if datetime_like:
+                block_values = block.array.asi8.astype(np.float64)
+                block_values[block.isnull().to_numpy()] = np.nan
+            else:
+                block_values = block.to_numpy(dtype=np.float64, na_value=np.nan)
+            sketch.update(block_values)
+
+        fill_value = sketch.median()
+        if datetime_like:
+            fill_value = pd.NaT if np.isnan(fill_value) else \
+                pd.Series([int(round(fill_value))]).astype(column_values.dtype).iloc[0]
+        return fill_value, sketch.achieved_error
+
+    sketch = FrequencySketch(approximate_error)
+    for start in range(0, len(column_values), block_size):
+        sketch.update(column_values.iloc[start:start + block_size].values)
+    return sketch.most_frequent(), sketch.achieved_error
+
+
+# Values of pandas.api.types.infer_dtype for object columns that hold numbers, whose NaNs are replaced with the median
+_NUMERICAL_INFERRED_TYPES = frozenset(['integer', 'floating', 'mixed-integer-float', 'decimal'])
+
+def _classify_columns(input_dataframe, columns):
+    """Splits the columns by the statistic that replaces their NaNs, judging from their dtypes alone
+
+    Returns
+    ----------
+    numerical_columns: list
+        Columns with a numerical dtype, whose medians can be computed a batch at a time
+    median_columns: list
+        Datetime, timedelta, and object columns of numbers, whose medians are computed one column at a time
+    mode_columns: list
+        All remaining columns, such as strings and categoricals, whose NaNs are replaced with the mode
+
+    """
+    column_dtypes = _column_dtypes(input_dataframe)
+    numerical_columns = []
+    median_columns = []
+    mode_columns = []
+    for column in columns:
+        dtype = column_dtypes[column]
+        if pd.api.types.is_numeric_dtype(dtype):
+            numerical_columns.append(column)
+        elif pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+            median_columns.append(column)
+        elif (pd.api.types.is_object_dtype(dtype) and
+              pd.api.types.infer_dtype(input_dataframe[column].values, skipna=True) in _NUMERICAL_INFERRED_TYPES):
+            median_columns.append(column)
+        else:
+            mode_columns.append(column)
+    return numerical_columns, median_columns, mode_columns
+
+
+# Number of values sampled from every object column to decide whether it holds numbers or dates stored as strings
+_COERCE_SAMPLE_SIZE = 1000
+
+# Number of values of a column that its date format is guessed from
+_FORMAT_SAMPLE_SIZE = 20
+
+# Words that pandas parses as the current date and time, which are not dates of the data set
+_RELATIVE_DATE_WORDS = frozenset(['now', 'today'])
+
+def _guess_datetime_formats(values):
+    """Returns the most common date formats guessed from the first string values, month first and day first
+
+    Formats that start with an ISO 8601 date are returned as 'ISO8601', so that values with and without a time
+    of day both parse with it. The list is empty if no format can be guessed, and holds a single format if the
+    values are not ambiguous.
+    """
+    from pandas.tseries.api import guess_datetime_format
+
+    guessed_formats = {False: [], True: []}
+    n_guessed = 0
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        for dayfirst in (False, True):
+            with warnings.catch_warnings():
+                # Values that can only be month first warn when guessed day first
+                warnings.simplefilter('ignore', UserWarning)
+                guessed_format = guess_datetime_format(value, dayfirst=dayfirst)
+            if guessed_format is not None:
+                guessed_formats[dayfirst].append('ISO8601' if guessed_format.startswith('%Y-%m-%d')
+                                                 else guessed_format)
+        n_guessed += 1
+        if n_guessed == _FORMAT_SAMPLE_SIZE:
+            break
+
+    date_formats = []
+    for dayfirst in (False, True):
+        if len(guessed_formats[dayfirst]) > 0:
+            date_format = pd.Series(guessed_formats[dayfirst]).mode()[0]
+            if date_format not in date_formats:
+                date_formats.append(date_format)
+    return date_formats
+
+
+def _parse_datetimes(column_values):
+    """Converts a column of dates stored as strings to datetimes; values that do not parse become NaT
+
+    The column is parsed in a single vectorized pass with the format guessed from its values, or with whichever
+    of the month-first and day-first formats parses more values if the guess is ambiguous. Only a column whose
+    format cannot be guessed is parsed value by value, with every value in its own format.
+    """
+    datetimes = None
+    for date_format in _guess_datetime_formats(column_values.values):
+        format_datetimes = pd.to_datetime(column_values, errors='coerce', format=date_format)
+        if datetimes is None or format_datetimes.notnull().sum() > datetimes.notnull().sum():
+            datetimes = format_datetimes
+    if datetimes is None:
+        datetimes = pd.to_datetime(column_values, errors='coerce', format='mixed')
+    relative_dates = column_values.astype(str).str.strip().str.lower().isin(_RELATIVE_DATE_WORDS)
+    if relative_dates.any():
+        datetimes[relative_dates] = pd.NaT
+    return datetimes
+
+def _coercible_columns(input_dataframe, threshold, seed=0):
+    """Finds the object columns whose values are mostly numbers or dates stored as strings
+
+    Up to `_COERCE_SAMPLE_SIZE` non-NaN values are sampled from every object column and parsed as numbers, and
+    failing that as dates in the format guessed from them, in a single vectorized call per column.
+
+    Parameters
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set to inspect
+    threshold: float
+        Smallest fraction of the sampled values that must parse for a column to be converted
+    seed: int
+        Seed of the random sample (default: 0)
+
+    Returns
+    ----------
+    coerced_columns: dict
+        Maps each column to convert to 'numeric' or 'datetime'
+
+    """
+    random_state = np.random.RandomState(seed)
+    coerced_columns = {}
+    for column in _object_columns(input_dataframe):
+        column_values = input_dataframe[column]
+        if len(column_values) > _COERCE_SAMPLE_SIZE:
+            column_values = column_values.iloc[random_state.choice(len(column_values), _COERCE_SAMPLE_SIZE,
+                                                                   replace=False)]
+        column_values = column_values[column_values.notnull()]
+        if len(column_values) == 0:
+            continue
+
+        if pd.to_numeric(column_values, errors='coerce').notnull().mean() >= threshold:
+            coerced_columns[column] = 'numeric'
+        elif _parse_datetimes(column_values).notnull().mean() >= threshold:
+            coerced_columns[column] = 'datetime'
+    return coerced_columns
+
+
+def _coerce_columns(input_dataframe, coerced_columns, profiler=None):
+    """Converts columns to numbers or dates in place; values that do not parse become NaN (or NaT)"""
+    for column, column_type in coerced_columns.items():
+        with _stage(profiler, 'coerce_types', [column], len(input_dataframe)):
+            if column_type == 'numeric':
+                input_dataframe[column] = pd.to_numeric(input_dataframe[column], errors='coerce')
+            else:
+                input_dataframe[column] = _parse_datetimes(input_dataframe[column])
+
+
+def _fill_from_neighbors(input_dataframe, columns):
+    """Replaces the NaNs of the columns with the nearest valid value below them, or above them for trailing NaNs
+
+    All columns are filled in a single pass over the whole group, and the filled columns are returned as a
+    new DataFrame.
+    """
+    return input_dataframe[columns].bfill().ffill()
+
+
+def _compute_fill_values(input_dataframe, columns, profiler=None, approximate_error=None):
+    """Computes the values that replace the NaNs in each of the given columns
+
+    The columns are classified by their dtypes up front. Numerical columns are replaced with their median,
+    which is computed for a whole batch of them at once. Datetime columns and object columns of numbers are
+    replaced with their median, and all other columns with their mode.
+    With `approximate_error`, the same medians and modes are estimated with sketches instead.
+
+    Parameters
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set to compute the fill values from
+    columns: list
+        Columns to compute the fill values for
+    profiler: datacleaner.Profiler
+        Records the time and memory of every batch of medians and every mode (default: None)
+    approximate_error: float
+        Estimate the fill values with sketches whose error is at most this fraction of the rows (default: None)
+
+    Returns
+    ----------
+    fill_values: dict
+        Maps each column to the value that replaces its NaNs
+    unfillable_columns: list
+        Columns for which neither a median nor a mode can be computed
+    fill_errors: dict
+        Maps each column to the achieved error of its estimated fill value; empty without `approximate_error`
+
+    """
+    fill_values = {}
+    unfillable_columns = []
+    fill_errors = {}
+    numerical_columns, median_columns, mode_columns = _classify_columns(input_dataframe, columns)
+
+    if approximate_error is not None:
+        mode_columns = set(mode_columns)
+        for column in columns:
+            with _stage(profiler, 'sketch', [column], len(input_dataframe)):
+                fill_value, fill_errors[column] = _approximate_fill_value(input_dataframe[column], approximate_error,
+                                                                          median=column not in mode_columns)
+            if fill_value is None:
+                unfillable_columns.append(column)
+            else:
+                fill_values[column] = fill_value
+        return fill_values, unfillable_columns, fill_errors
+
+    for batch in _column_batches(input_dataframe, numerical_columns):
+        with _stage(profiler, 'median', batch, len(input_dataframe)):
+            fill_values.update(input_dataframe[batch].median().to_dict())
+
+    for column in median_columns:
+        with _stage(profiler, 'median', [column], len(input_dataframe)):
+            fill_values[column] = input_dataframe[column].median()
+
+    for column in mode_columns:
+        with _stage(profiler, 'mode', [column], len(input_dataframe)):
+            most_frequent = input_dataframe[column].mode()
+        if len(most_frequent) > 0:
+            fill_values[column] = most_frequent[0]
+        else:
+            unfillable_columns.append(column)
+
+    return fill_values, unfillable_columns, fill_errors
+
+
+def _fill_nans(input_dataframe, fill_values, profiler=None):
+    """Replaces the NaNs in each column with its fill value, modifying the DataFrame in place
+
+    Floating-point columns of the same NumPy dtype are filled a batch at a time with a single vectorized
+    operation, and the filled values are written back into the existing columns. Columns of pandas extension
+    dtypes, such as the nullable `Float64`, are filled one at a time.
+
+    Parameters
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set to fill the NaNs in
+    fill_values: dict
+        Maps each column to the value that replaces its NaNs
+    profiler: datacleaner.Profiler
+        Records the time and memory of filling every column or batch of columns (default: None)
+
+    Returns
+    ----------
+    None
+
+    """
+    column_dtypes = _column_dtypes(input_dataframe)
+    float_columns = {}
+    for column, fill_value in fill_values.items():
+        if isinstance(column_dtypes[column], np.dtype) and column_dtypes[column].kind == 'f':
+            float_columns.setdefault(column_dtypes[column], []).append(column)
+        else:
+            with _stage(profiler, 'fill_nans', [column], len(input_dataframe)):
+                input_dataframe[column] = input_dataframe[column].fillna(fill_value)
+
+    for dtype, columns in float_columns.items():
+        for batch in _column_batches(input_dataframe, columns):
+            with _stage(profiler, 'fill_nans', batch, len(input_dataframe)):
+                positions = input_dataframe.columns.get_indexer(batch)
+                values = input_dataframe.iloc[:, positions].to_numpy(dtype=dtype)
+                if not values.flags.writeable:
+                    values = values.copy()
+                batch_fill_values = np.array([fill_values[column] for column in batch], dtype=dtype)
+                np.copyto(values, batch_fill_values, where=np.isnan(values))
+                input_dataframe.iloc[:, positions] = values
+
+
+def _column_dtypes(input_dataframe):
+    """Returns a dict that maps each column of the DataFrame to its dtype"""
+    return dict(zip(input_dataframe.columns.values, input_dataframe.dtypes.values))
+
+
+def _object_columns(input_dataframe):
+    """Returns the columns of the DataFrame that have the object dtype"""
+    return [column for column, dtype in zip(input_dataframe.columns.values, input_dataframe.dtypes.values)
+            if str(dtype) == 'object']
+
+
+def _columns_with_nans(input_dataframe):
+    """Returns the columns of the DataFrame that contain at least one NaN"""
+    return list(input_dataframe.columns.values[input_dataframe.isnull().any().values])
+
+
+def _fit_column_group(input_dataframe, fill_columns, encoder, encoder_kwargs, fill_from_neighbors, return_encoded,
+                      profiler=None, approximate_error=None):
+    """Computes the fill values and fits the encoders for a group of columns
+
+    Parameters
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set that holds the group of columns
+    fill_columns: list
+        Columns to compute the fill values for
+    encoder: category_encoders transformer
+        Encoder class to fit on every categorical column, or None for LabelEncoder; no encoders are fitted for
+        encoders of whole DataFrames, whose categorical columns are filled like all other columns instead
+    encoder_kwargs: dict
+        Keyword arguments passed to the encoder
+    fill_from_neighbors: bool
+        Fill the NaNs of categorical columns without a mode with the nearest valid value before encoding them
+    return_encoded: bool
+        Also return the encoded values of the categorical columns
+    profiler: datacleaner.Profiler
+        Records the time and memory of every fill value and encoder (default: None)
+    approximate_error: float
+        Estimate the fill values with sketches whose error is at most this fraction of the rows (default: None)
+
+    Returns
+    ----------
+    fill_values: dict
+        Maps each column to the value that replaces its NaNs
+    unfillable_columns: list
+        Columns for which neither a median nor a mode can be computed
+    fill_errors: dict
+        Maps each column to the achieved error of its estimated fill value; empty without `approximate_error`
+    encoders: dict
+        Maps each categorical column to its fitted encoder
+    encoded_columns: dict
+        Maps each categorical column to its encoded values if `return_encoded` is True
+
+    """
+    fill_values, unfillable_columns, fill_errors = _compute_fill_values(input_dataframe, fill_columns, profiler,
+                                                                        approximate_error)
+
+    object_columns = _object_columns(input_dataframe)
+    if _encodes_frame(encoder):
+        object_columns = []
+    neighbor_filled = None
+    if fill_from_neighbors:
+        unfillable = set(unfillable_columns)
+        neighbor_columns = [column for column in object_columns if column in unfillable]
+        if len(neighbor_columns) > 0:
+            with _stage(profiler, 'neighbor_fill', neighbor_columns, len(input_dataframe)):
+                neighbor_filled = _fill_from_neighbors(input_dataframe, neighbor_columns)
+
+    encoders = {}
+    encoded_columns = {}
+    for column in object_columns:
+        column_values = input_dataframe[column]
+        if column in fill_values:
+            with _stage(profiler, 'fill_nans', [column], len(column_values)):
+                column_values = column_values.fillna(fill_values[column])
+        elif neighbor_filled is not None and column in neighbor_filled:
+            column_values = neighbor_filled[column]
+
+        if encoder is not None:
+            encoders[column] = encoder(**encoder_kwargs)
+        else:
+            from sklearn.preprocessing import LabelEncoder
+            encoders[column] = LabelEncoder()
+
+        with _stage(profiler, 'encoder_fit', [column], len(column_values)):
+            if return_encoded:
+                encoded_columns[column] = encoders[column].fit_transform(column_values.values)
+            else:
+                encoders[column].fit(column_values.values)
+
+    return fill_values, unfillable_columns, fill_errors, encoders, encoded_columns
+
+
+def _column_groups(columns, n_jobs):
+    """Deals the columns round-robin into one group per job"""
+    from joblib import effective_n_jobs
+    n_groups = min(effective_n_jobs(n_jobs), len(columns))
+    return [columns[i::n_groups] for i in range(n_groups)]
+
+
+def _fit_columns(input_dataframe, fill_columns, encoder, encoder_kwargs, fill_from_neighbors, return_encoded,
+                 n_jobs, profiler=None, approximate_error=None):
+    """Runs `_fit_column_group()` on all columns of the DataFrame, spread over `n_jobs` parallel jobs
+
+    Every job receives one group of columns, so each column is sent to a worker only once. The results are
+    merged in column order, so they are identical to running `_fit_column_group()` on the whole DataFrame.
+    The `profiler` records every column when there is only one job, and the jobs as a single 'fit' stage otherwise.
+
+    """
+    if n_jobs == 1:
+        return _fit_column_group(input_dataframe, fill_columns, encoder, encoder_kwargs,
+                                 fill_from_neighbors, return_encoded, profiler, approximate_error)
+
+    from joblib import Parallel, delayed
+    columns = list(input_dataframe.columns.values)
+    fill_columns = set(fill_columns)
+    column_groups = _column_groups(columns, n_jobs)
+    with _stage(profiler, 'fit', columns, len(input_dataframe)):
+        group_results = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_column_group)(input_dataframe[group], [column for column in group if column in fill_columns],
+                                       encoder, encoder_kwargs, fill_from_neighbors, return_encoded,
+                                       approximate_error=approximate_error)
+            for group in column_groups)
+
+    merged_results = ({}, [], {}, {}, {})
+    for column in columns:
+        for group_result in group_results:
+            if column in group_result[1]:
+                merged_results[1].append(column)
+            for result_index in (0, 2, 3, 4):
+                if column in group_result[result_index]:
+                    merged_results[result_index][column] = group_result[result_index][column]
+
+    return merged_results
+
+
+def _encode_column_group(input_dataframe, encoders, profiler=None):
+    """Encodes a group of categorical columns with their fitted encoders"""
+    encoded_columns = {}
+    for column, column_encoder in encoders.items():
+        with _stage(profiler, 'encode', [column], len(input_dataframe)):
+            encoded_columns[column] = column_encoder.transform(input_dataframe[column].values)
+    return encoded_columns
+
+
+def _encode_columns(input_dataframe, encoders, n_jobs, profiler=None):
+    """Encodes the categorical columns of the DataFrame in place, spread over `n_jobs` parallel jobs"""
+    if n_jobs == 1:
+        encoded_columns = _encode_column_group(input_dataframe, encoders, profiler)
+    else:
+        from joblib import Parallel, delayed
+        encoded_columns = {}
+        columns = [column for column in input_dataframe.columns.values if column in encoders]
+        with _stage(profiler, 'encode', columns, len(input_dataframe)):
+            for group_encoded_columns in Parallel(n_jobs=n_jobs)(
+                    delayed(_encode_column_group)(input_dataframe[group], dict((column, encoders[column])
+                                                                               for column in group))
+                    for group in _column_groups(columns, n_jobs)):
+                encoded_columns.update(group_encoded_columns)
+
+    for column in input_dataframe.columns.values:
+        if column in encoded_columns:
+            input_dataframe[column] = encoded_columns[column]
+
+
+def _encodes_frame(encoder):
+    """Returns True if the encoder class encodes all categorical columns of a DataFrame at once"""
+    return getattr(encoder, 'encodes_frame', False)
+
+
+def _encode_frame(input_dataframe, frame_encoder, columns, fit=False, profiler=None):
+    """Encodes the categorical columns of the DataFrame with a single encoder of whole DataFrames
+
+    Dense encodings replace the categorical columns in place. A scipy.sparse encoding replaces them with sparse
+    pandas columns, which are appended after the remaining columns of a new DataFrame.
+
+    Parameters
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set whose NaNs were already replaced
+    frame_encoder: datacleaner.encoders._FrameEncoder
+        Encoder of the categorical columns
+    columns: list
+        Categorical columns to encode
+    fit: bool
+        Fit the encoder on the columns before encoding them (default: False)
+    profiler: datacleaner.Profiler
+        Records the time and memory of fitting and encoding (default: None)
+
+    Returns
+    ----------
+    output_dataframe: pandas.DataFrame
+        Data set with the encoded columns
+
+    """
+    if len(columns) == 0:
+        return input_dataframe
+
+    with _stage(profiler, 'encoder_fit' if fit else 'encode', columns, len(input_dataframe)):
+        if fit:
+            encoded = frame_encoder.fit_transform(input_dataframe[columns])
+        else:
+            encoded = frame_encoder.transform(input_dataframe[columns])
+
+    with _stage(profiler, 'assign_encoded', columns, len(input_dataframe)):
+        if not isinstance(encoded, pd.DataFrame):
+            encoded = pd.DataFrame.sparse.from_spmatrix(encoded, index=input_dataframe.index,
+                                                        columns=frame_encoder.get_feature_names_out())
+            return pd.concat([input_dataframe.drop(columns=columns), encoded], axis=1)
+
+        for column in columns:
+            input_dataframe[column] = encoded[column].values
+    return input_dataframe
+
+
+def _build_lookup_table(column_encoder, categories, mode_value, handle_unknown):
+    """Precomputes the codes of a fitted encoder for every training category
+
+    Parameters
+    ----------
+    column_encoder: fitted encoder
+        Encoder of the categorical column
+    categories: numpy.ndarray
+        Categories of the column in the training data set
+    mode_value: object
+        Most frequent category of the column in the training data set
+    handle_unknown: str
+        'unknown' to encode unseen categories as -1, or 'mode' to encode them like `mode_value`
+
+    Returns
+    ----------
+    category_index: pandas.Index
+        Hash index of the training categories
+    codes: numpy.ndarray
+        Codes of the training categories in index order, followed by the code for unseen categories, so that
+        `codes[category_index.get_indexer(values)]` encodes a whole column at once
+    output_categories: pandas.Index
+        Categories of the encoder output if the encoder returns a pandas Categorical, otherwise None
+
+    """
+    encoded_categories = column_encoder.transform(categories)
+    output_categories = None
+    if isinstance(encoded_categories, pd.Categorical):
+        output_categories = encoded_categories.categories
+        encoded_categories = encoded_categories.codes
+    encoded_categories = np.asarray(encoded_categories)
+
+    category_index = pd.Index(categories)
+    unknown_code = -1
+    if handle_unknown == 'mode' and mode_value in category_index:
+        unknown_code = encoded_categories[category_index.get_loc(mode_value)]
+
+    codes = np.append(encoded_categories, np.array([unknown_code], dtype=encoded_categories.dtype))
+    return category_index, codes, output_categories
+
+
 def autoclean(input_dataframe, drop_nans=False, copy=False, encoder=None,
-              encoder_kwargs=None, ignore_update_check=False):
+              encoder_kwargs=None, ignore_update_check=False, n_jobs=1, downcast=False, profiler=None,
+              approximate_error=None, coerce_threshold=None, max_categories=0):
     """Performs a series of automated data cleaning transformations on the provided data set
 
     Parameters
@@ -47,6 +716,24 @@ def autoclean(input_dataframe, drop_nans=False, copy=False, encoder=None,
         The a valid sklearn transformer to encode categorical features. Default (None)
     ignore_update_check: bool
         Do not check for the latest version of datacleaner
+    n_jobs: int
+        Number of parallel jobs to clean the columns with; -1 uses all CPU cores (default: 1)
+    downcast: bool
+        Store every cleaned column in the smallest dtype that holds its values exactly; see
+        `downcast_dataframe()` (default: False)
+    profiler: datacleaner.Profiler
+        Records the wall time and memory use of every cleaning stage (default: None)
+    approximate_error: float
+        Estimate the medians and modes with mergeable sketches instead of computing them exactly. The rank
+        error of every median and the frequency error of every mode is at most this fraction of the rows;
+        the achieved errors are stored per column in `output_dataframe.attrs['fill_errors']` (default: None)
+    coerce_threshold: float
+        Convert object columns to numbers (or else dates) if at least this fraction of a sample of their values
+        parses as such, before replacing their NaNs. Values that do not parse are replaced like NaNs, and the
+        converted columns get the median instead of being encoded (default: None)
+    max_categories: int
+        With `downcast`, also convert float and object columns with at most this many distinct values to the
+        category dtype. The number of bytes saved is stored in `output_dataframe.attrs['bytes_saved']` (default: 0)
 
     Returns
     ----------
@@ -54,51 +741,63 @@ def autoclean(input_dataframe, drop_nans=False, copy=False, encoder=None,
         Cleaned data set
 
     """
-    global update_checked
-    if ignore_update_check:
-        update_checked = True
-
-    if not update_checked:
-        update_check('datacleaner', __version__)
-        update_checked = True
+    _check_for_updates(ignore_update_check)
 
     if copy:
-        input_dataframe = input_dataframe.copy()
+        with _stage(profiler, 'copy', rows=len(input_dataframe)):
+            input_dataframe = input_dataframe.copy()
 
     if drop_nans:
-        input_dataframe.dropna(inplace=True)
+        with _stage(profiler, 'drop_nans', rows=len(input_dataframe)):
+            input_dataframe.dropna(inplace=True)
+
+    if coerce_threshold is not None:
+        with _stage(profiler, 'find_coercible', rows=len(input_dataframe)):
+            coerced_columns = _coercible_columns(input_dataframe, coerce_threshold)
+        _coerce_columns(input_dataframe, coerced_columns, profiler)
 
     if encoder_kwargs is None:
         encoder_kwargs = {}
 
-    for column in input_dataframe.columns.values:
-        # Replace NaNs with the median or mode of the column depending on the column type
-        try:
-            input_dataframe[column].fillna(input_dataframe[column].median(), inplace=True)
-        except TypeError:
-            most_frequent = input_dataframe[column].mode()
-            # If the mode can't be computed, use the nearest valid value
-            # See https://github.com/rhiever/datacleaner/issues/8
-            if len(most_frequent) > 0:
-                input_dataframe[column].fillna(input_dataframe[column].mode()[0], inplace=True)
-            else:
-                input_dataframe[column].fillna(method='bfill', inplace=True)
-                input_dataframe[column].fillna(method='ffill', inplace=True)
+    with _stage(profiler, 'find_nans', rows=len(input_dataframe)):
+        nan_columns = _columns_with_nans(input_dataframe)
 
+    # Replace NaNs with the median or mode of the column depending on the column type,
+    # then encode all strings with numerical equivalents
+    fill_values, unfillable_columns, fill_errors, _, encoded_columns = _fit_columns(
+        input_dataframe, nan_columns, encoder, encoder_kwargs, fill_from_neighbors=True, return_encoded=True,
+        n_jobs=n_jobs, profiler=profiler, approximate_error=approximate_error)
+    _fill_nans(input_dataframe, dict((column, fill_value) for column, fill_value in fill_values.items()
+                                     if column not in encoded_columns), profiler)
 
-        # Encode all strings with numerical equivalents
-        if str(input_dataframe[column].values.dtype) == 'object':
-            if encoder is not None:
-                column_encoder = encoder(**encoder_kwargs).fit(input_dataframe[column].values)
-            else:
-                column_encoder = LabelEncoder().fit(input_dataframe[column].values)
+    # If the mode can't be computed, use the nearest valid value
+    # See https://github.com/rhiever/datacleaner/issues/8
+    neighbor_columns = [column for column in unfillable_columns if column not in encoded_columns]
+    if len(neighbor_columns) > 0:
+        with _stage(profiler, 'neighbor_fill', neighbor_columns, len(input_dataframe)):
+            input_dataframe[neighbor_columns] = _fill_from_neighbors(input_dataframe, neighbor_columns)
 
-            input_dataframe[column] = column_encoder.transform(input_dataframe[column].values)
+    with _stage(profiler, 'assign_encoded', list(encoded_columns), len(input_dataframe)):
+        for column in input_dataframe.columns.values:
+            if column in encoded_columns:
+                input_dataframe[column] = encoded_columns[column]
+
+    if _encodes_frame(encoder):
+        input_dataframe = _encode_frame(input_dataframe, encoder(**encoder_kwargs), _object_columns(input_dataframe),
+                                        fit=True, profiler=profiler)
+
+    if downcast:
+        with _stage(profiler, 'downcast', rows=len(input_dataframe)):
+            input_dataframe.attrs['bytes_saved'] = downcast_dataframe(input_dataframe, max_categories=max_categories)
+
+    if approximate_error is not None:
+        input_dataframe.attrs['fill_errors'] = fill_errors
 
     return input_dataframe
 
 def autoclean_cv(training_dataframe, testing_dataframe, drop_nans=False, copy=False,
-                 encoder=None, encoder_kwargs=None, ignore_update_check=False):
+                 encoder=None, encoder_kwargs=None, ignore_update_check=False, n_jobs=1, handle_unknown='error',
+                 profiler=None, approximate_error=None, cache_dir=None, coerce_threshold=None):
     """Performs a series of automated data cleaning transformations on the provided training and testing data sets
 
     Unlike `autoclean()`, this function takes cross-validation into account by learning the data transformations
@@ -121,6 +820,23 @@ def autoclean_cv(training_dataframe, testing_dataframe, drop_nans=False, copy=Fa
         The a valid sklearn transformer to encode categorical features. Default (None)
     ignore_update_check: bool
         Do not check for the latest version of datacleaner
+    n_jobs: int
+        Number of parallel jobs to clean the columns with; -1 uses all CPU cores (default: 1)
+    handle_unknown: str
+        What to do with categories in the testing data set that are not in the training data set:
+        'error' raises an error, 'unknown' encodes them as -1, and 'mode' encodes them like the most
+        frequent category of the training data set (default: 'error')
+    profiler: datacleaner.Profiler
+        Records the wall time and memory use of every cleaning stage (default: None)
+    approximate_error: float
+        Estimate the medians and modes of the training data set with mergeable sketches instead of computing
+        them exactly; see `autoclean()` (default: None)
+    cache_dir: str or datacleaner.cache.FitCache
+        Directory of an on-disk cache for the transformations learned from the training data set, so that
+        cleaning the same training data set with the same options again skips learning them (default: None)
+    coerce_threshold: float
+        Convert the object columns that are mostly numbers (or else dates) in the training data set to numbers
+        (or dates) in all data sets; see `autoclean()` (default: None)
 
     Returns
     ----------
@@ -130,67 +846,616 @@ def autoclean_cv(training_dataframe, testing_dataframe, drop_nans=False, copy=Fa
         Cleaned testing data set
 
     """
-    global update_checked
-    if ignore_update_check:
-        update_checked = True
+    training_dataframe, (testing_dataframe,) = autoclean_splits(training_dataframe, [testing_dataframe],
+                                                                drop_nans=drop_nans, copy=copy, encoder=encoder,
+                                                                encoder_kwargs=encoder_kwargs,
+                                                                ignore_update_check=ignore_update_check,
+                                                                n_jobs=n_jobs, handle_unknown=handle_unknown,
+                                                                profiler=profiler,
+                                                                approximate_error=approximate_error,
+                                                                cache_dir=cache_dir,
+                                                                coerce_threshold=coerce_threshold)
+    return training_dataframe, testing_dataframe
 
-    if not update_checked:
-        update_check('datacleaner', __version__)
-        update_checked = True
 
-    if set(training_dataframe.columns.values) != set(testing_dataframe.columns.values):
-        raise ValueError('The training and testing DataFrames do not have the same columns. '
-                         'Make sure that you are providing the same columns.')
+def autoclean_splits(training_dataframe, testing_dataframes, drop_nans=False, copy=False,
+                     encoder=None, encoder_kwargs=None, ignore_update_check=False, n_jobs=1, handle_unknown='error',
+                     profiler=None, approximate_error=None, cache_dir=None, coerce_threshold=None):
+    """Performs the same cleaning transformations as `autoclean_cv()` on any number of testing data sets
+
+    The data transformations are learned from the training data set only once, and then applied to the training
+    data set and all testing data sets (e.g., a validation and a test set, or the folds of a k-fold split)
+    together: each categorical column is encoded for all data sets with a single call of its encoder.
 
+    Parameters
+    ----------
+    training_dataframe: pandas.DataFrame
+        Training data set
+    testing_dataframes: list
+        Testing data sets (pandas.DataFrame), which must all have the same columns as the training data set
+    drop_nans: bool
+        Drop all rows that have a NaN in any column (default: False)
+    copy: bool
+        Make a copy of the data sets (default: False)
+    encoder: category_encoders transformer
+        The a valid category_encoders transformer which is passed an inferred cols list. Default (None: LabelEncoder)
+    encoder_kwargs: category_encoders
+        The a valid sklearn transformer to encode categorical features. Default (None)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    n_jobs: int
+        Number of parallel jobs to clean the columns with; -1 uses all CPU cores (default: 1)
+    handle_unknown: str
+        What to do with categories in the testing data sets that are not in the training data set; see
+        `autoclean_cv()` (default: 'error')
+    profiler: datacleaner.Profiler
+        Records the wall time and memory use of every cleaning stage (default: None)
+    approximate_error: float
+        Estimate the medians and modes of the training data set with mergeable sketches instead of computing
+        them exactly; see `autoclean()` (default: None)
+    cache_dir: str or datacleaner.cache.FitCache
+        Directory of an on-disk cache for the transformations learned from the training data set; see
+        `autoclean_cv()` (default: None)
+    coerce_threshold: float
+        Convert the object columns that are mostly numbers (or else dates) in the training data set to numbers
+        (or dates) in all data sets; see `autoclean()` (default: None)
+
+    Returns
+    ----------
+    output_training_dataframe: pandas.DataFrame
+        Cleaned training data set
+    output_testing_dataframes: list
+        Cleaned testing data sets, in the same order as `testing_dataframes`
+
+    """
+    _check_for_updates(ignore_update_check)
+
+    testing_dataframes = list(testing_dataframes)
+    for testing_dataframe in testing_dataframes:
+        if set(training_dataframe.columns.values) != set(testing_dataframe.columns.values):
+            raise ValueError('The training and testing DataFrames do not have the same columns. '
+                             'Make sure that you are providing the same columns.')
+
+    all_dataframes = [training_dataframe] + testing_dataframes
     if copy:
-        training_dataframe = training_dataframe.copy()
-        testing_dataframe = testing_dataframe.copy()
-    
+        with _stage(profiler, 'copy', rows=sum(len(dataframe) for dataframe in all_dataframes)):
+            all_dataframes = [dataframe.copy() for dataframe in all_dataframes]
+
     if drop_nans:
-        training_dataframe.dropna(inplace=True)
-        testing_dataframe.dropna(inplace=True)
+        with _stage(profiler, 'drop_nans', rows=sum(len(dataframe) for dataframe in all_dataframes)):
+            for dataframe in all_dataframes:
+                dataframe.dropna(inplace=True)
 
-    if encoder_kwargs is None:
-        encoder_kwargs = {}
+    from .cleaner import DataCleaner
+    cleaner = DataCleaner(copy=False, encoder=encoder, encoder_kwargs=encoder_kwargs, ignore_update_check=True,
+                          n_jobs=n_jobs, handle_unknown=handle_unknown, approximate_error=approximate_error,
+                          cache_dir=cache_dir, coerce_threshold=coerce_threshold)
+    cleaner.fit(all_dataframes[0], profiler=profiler)
+    all_dataframes = cleaner.transform_many(all_dataframes, profiler=profiler)
 
-    for column in training_dataframe.columns.values:
-        # Replace NaNs with the median or mode of the column depending on the column type
-        try:
-            column_median = training_dataframe[column].median()
-            training_dataframe[column].fillna(column_median, inplace=True)
-            testing_dataframe[column].fillna(column_median, inplace=True)
-        except TypeError:
-            column_mode = training_dataframe[column].mode()[0]
-            training_dataframe[column].fillna(column_mode, inplace=True)
-            testing_dataframe[column].fillna(column_mode, inplace=True)
-
-        # Encode all strings with numerical equivalents
-        if str(training_dataframe[column].values.dtype) == 'object':
-            if encoder is not None:
-                column_encoder = encoder(**encoder_kwargs).fit(training_dataframe[column].values)
-            else:
-                column_encoder = LabelEncoder().fit(training_dataframe[column].values)
+    if approximate_error is not None:
+        for dataframe in all_dataframes:
+            dataframe.attrs['fill_errors'] = cleaner.fill_errors_
 
-            training_dataframe[column] = column_encoder.transform(training_dataframe[column].values)
-            testing_dataframe[column] = column_encoder.transform(testing_dataframe[column].values)
+    return all_dataframes[0], all_dataframes[1:]
 
-    return training_dataframe, testing_dataframe
+
+def _smallest_integer_dtype(min_value, max_value):
+    """Returns the smallest integer dtype that holds every value from `min_value` to `max_value`"""
+    candidate_dtypes = (np.uint8, np.uint16, np.uint32, np.uint64) if min_value >= 0 else \
+        (np.int8, np.int16, np.int32, np.int64)
+    for dtype in candidate_dtypes:
+        if np.iinfo(dtype).min <= min_value and max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def downcast_dataframe(input_dataframe, max_categories=0):
+    """Stores every column of the data set in the smallest dtype that holds all of its values exactly
+
+    Integer columns are converted to the smallest integer dtype that fits their minimum and maximum, and float64
+    columns are converted to float32 if none of their values lose precision. Optionally, float and object
+    columns with few distinct values are converted to the category dtype. Columns of pandas extension dtypes,
+    such as the sparse indicator columns of `SparseOneHotEncoder`, are left as they are. The data set is
+    modified in place.
+
+    Parameters
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set to downcast
+    max_categories: int
+        Convert float and object columns with at most this many distinct values to the category dtype (default: 0)
+
+    Returns
+    ----------
+    bytes_saved: int
+        Number of bytes by which the memory usage of the data set shrank
+
+    """
+    return _apply_dtypes(input_dataframe, _downcast_dtypes([input_dataframe], max_categories))
+
+
+def _downcast_dtypes(dataframes, max_categories=0):
+    """Finds the smallest dtype of every column that holds its values in all of the data sets exactly
+
+    The data sets, e.g. a training set and its testing sets, get the same dtype for every column, and columns
+    that are converted to the category dtype get the same categories in all of them. See `downcast_dataframe()`.
+
+    Returns
+    ----------
+    new_dtypes: dict
+        Maps each column that can be stored in a smaller dtype to that dtype
+    """
+    dataframes = [dataframe for dataframe in dataframes if len(dataframe) > 0]
+    if len(dataframes) == 0:
+        return {}
+
+    column_dtypes = dict((column, dtype) for column, dtype in _column_dtypes(dataframes[0]).items()
+                         if isinstance(dtype, np.dtype) and
+                         all(dataframe[column].dtype == dtype for dataframe in dataframes[1:]))
+    new_dtypes = {}
+
+    integer_columns = [column for column, dtype in column_dtypes.items() if dtype.kind in 'iu']
+    if len(integer_columns) > 0:
+        column_mins = np.min([dataframe[integer_columns].min().values for dataframe in dataframes], axis=0)
+        column_maxs = np.max([dataframe[integer_columns].max().values for dataframe in dataframes], axis=0)
+        for column, column_min, column_max in zip(integer_columns, column_mins, column_maxs):
+            smallest_dtype = _smallest_integer_dtype(column_min, column_max)
+            if smallest_dtype.itemsize < column_dtypes[column].itemsize:
+                new_dtypes[column] = smallest_dtype
+
+    float_columns = [column for column, dtype in column_dtypes.items() if dtype == np.float64]
+    lossless_columns = set(float_columns)
+    for dataframe in dataframes:
+        for column_batch in _column_batches(dataframe, float_columns):
+            float_values = dataframe[column_batch].to_numpy()
+            with np.errstate(over='ignore'):
+                lossless = ((float_values.astype(np.float32).astype(np.float64) == float_values) |
+                            np.isnan(float_values)).all(axis=0)
+            lossless_columns.difference_update(column for column, column_lossless in zip(column_batch, lossless)
+                                               if not column_lossless)
+    for column in float_columns:
+        if column in lossless_columns:
+            new_dtypes[column] = np.dtype(np.float32)
+
+    if max_categories > 0:
+        for column, dtype in column_dtypes.items():
+            if dtype.kind == 'f' or dtype == np.dtype('object'):
+                categories = pd.Index(pd.unique(np.concatenate([dataframe[column].dropna().unique()
+                                                                for dataframe in dataframes])))
+                if len(categories) <= max_categories:
+                    try:
+                        categories = categories.sort_values()
+                    except TypeError:
+                        pass
+                    new_dtypes[column] = pd.CategoricalDtype(categories)
+
+    return new_dtypes
+
+
+def _apply_dtypes(input_dataframe, new_dtypes):
+    """Converts the columns to their new dtypes in place and returns the number of bytes saved"""
+    bytes_saved = 0
+    for column in input_dataframe.columns.values:
+        if column in new_dtypes:
+            bytes_saved += input_dataframe[column].memory_usage(index=False, deep=True)
+            input_dataframe[column] = input_dataframe[column].astype(new_dtypes[column])
+            bytes_saved -= input_dataframe[column].memory_usage(index=False, deep=True)
+
+    return int(bytes_saved)
+
+
+def _array_dtype(column_dtype):
+    """Returns the NumPy dtype that a column is stored as in a dense array, or None if it is not numerical"""
+    if isinstance(column_dtype, pd.CategoricalDtype):
+        column_dtype = column_dtype.categories.dtype
+    if isinstance(column_dtype, np.dtype) and column_dtype.kind in 'biuf':
+        return column_dtype
+    return None
+
+
+def write_npy(output_dataframe, filename, dtype=None):
+    """Writes a cleaned data set to a memory-mapped .npy file as a dense 2D array with a single dtype
+
+    The array is preallocated in the file and filled a block of rows at a time, so writing it needs only a fixed
+    amount of extra memory instead of a full copy of the data set. The file can then be opened without parsing
+    or copying with `numpy.load(filename, mmap_mode='r')`. Its columns are in the order of the data set's columns.
+
+    Parameters
+    ----------
+    output_dataframe: pandas.DataFrame
+        Cleaned data set, whose columns must all be numerical (or categories of numbers)
+    filename: str
+        File name of the .npy file
+    dtype: numpy.dtype
+        dtype of the array; the smallest dtype that holds the values of every column if None (default: None)
+
+    Returns
+    ----------
+    None
+
+    """
+    column_dtypes = _column_dtypes(output_dataframe)
+    array_dtypes = []
+    for column, column_dtype in column_dtypes.items():
+        array_dtype = _array_dtype(column_dtype)
+        if array_dtype is None:
+            raise ValueError('Column {} has the non-numerical dtype {}, so the data set cannot be written to a '
+                             '.npy file.'.format(column, column_dtype))
+        array_dtypes.append(array_dtype)
+
+    if dtype is None:
+        dtype = np.result_type(*array_dtypes) if len(array_dtypes) > 0 else np.dtype(np.float64)
+
+    output_array = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=output_dataframe.shape)
+    block_size = max(1, _BATCH_BYTES // max(1, output_dataframe.shape[1] * np.dtype(dtype).itemsize))
+    for start in range(0, len(output_dataframe), block_size):
+        output_array[start:start + block_size] = output_dataframe.iloc[start:start + block_size].to_numpy(dtype=dtype)
+    output_array.flush()
+    del output_array
+
+
+def _summarize_chunk(chunk, approximate_error=None):
+    """Summarizes the columns of a single chunk so that it can be merged with the summaries of other chunks
+
+    Parameters
+    ----------
+    chunk: pandas.DataFrame
+        Chunk of the data set to summarize
+    approximate_error: float
+        Summarize the numerical columns with a QuantileSketch with this error instead of their value counts
+        (default: None)
+
+    Returns
+    ----------
+    summary: dict
+        Maps each column name to a (dtype, value_counts, quantile_sketch) tuple, in which either the value
+        counts or the sketch is None. Columns of a pandas string dtype, such as the `string[pyarrow]` columns
+        of Dask DataFrames, are summarized as object columns so that they are encoded like them
+
+    """
+    summary = {}
+    for column in chunk.columns.values:
+        column_values = chunk[column]
+        if approximate_error is not None and column_values.dtype.kind in 'iuf':
+            from .sketches import QuantileSketch
+            quantile_sketch = QuantileSketch(approximate_error).update(column_values.values)
+            summary[column] = (column_values.dtype, None, quantile_sketch)
+        elif column_values.dtype != np.dtype('object') and pd.api.types.is_string_dtype(column_values.dtype):
+            value_counts = column_values.value_counts(dropna=True, sort=False)
+            value_counts.index = value_counts.index.astype(object)
+            summary[column] = (np.dtype('object'), value_counts, None)
+        else:
+            summary[column] = (column_values.dtype, column_values.value_counts(dropna=True, sort=False), None)
+    return summary
+
+
+def _merge_dtypes(first_dtype, second_dtype):
+    """Returns the dtype that pandas would have inferred for a column if both chunks were read at once"""
+    if first_dtype == second_dtype:
+        return first_dtype
+    if (first_dtype.kind in 'iuf') and (second_dtype.kind in 'iuf'):
+        return np.result_type(first_dtype, second_dtype)
+    return np.dtype('object')
+
+
+def _merge_summaries(first_summary, second_summary):
+    """Merges two chunk summaries returned by `_summarize_chunk()`"""
+    if first_summary is None:
+        return second_summary
+
+    # A column that was summarized by value counts in one chunk and by a sketch in another has values of
+    # different types, so neither summary is kept and the column has to be summarized again as strings
+    merged_summary = {}
+    for column, (first_dtype, first_counts, first_sketch) in first_summary.items():
+        second_dtype, second_counts, second_sketch = second_summary[column]
+        merged_counts = None
+        if first_counts is not None and second_counts is not None:
+            merged_counts = first_counts.add(second_counts, fill_value=0).astype(np.int64)
+        merged_sketch = None
+        if first_sketch is not None and second_sketch is not None:
+            merged_sketch = first_sketch.merge(second_sketch)
+        merged_summary[column] = (_merge_dtypes(first_dtype, second_dtype), merged_counts, merged_sketch)
+    return merged_summary
+
+
+def _reduce_summaries(summaries):
+    """Merges any number of chunk summaries in a balanced tree
+
+    The summaries are merged like the digits of a binary counter: each new summary is merged with the pending
+    summary of the same number of chunks, if there is one. Every value count is therefore realigned only about
+    log2(number of chunks) times instead of once per chunk, and at most that many summaries are pending.
+
+    Parameters
+    ----------
+    summaries: iterable
+        Summaries returned by `_summarize_chunk()`
+
+    Returns
+    ----------
+    summary: dict
+        Merged summary, or None if there are no summaries
+
+    """
+    pending_summaries = []
+    for summary in summaries:
+        n_chunks = 1
+        while len(pending_summaries) > 0 and pending_summaries[-1][0] == n_chunks:
+            summary = _merge_summaries(pending_summaries.pop()[1], summary)
+            n_chunks *= 2
+        pending_summaries.append((n_chunks, summary))
+
+    merged_summary = None
+    for _, summary in pending_summaries:
+        merged_summary = _merge_summaries(merged_summary, summary)
+    return merged_summary
+
+
+def _median_from_counts(value_counts):
+    """Computes the exact median of a column from its value counts, mirroring `pandas.Series.median()`"""
+    if len(value_counts) == 0:
+        return np.nan
+
+    value_counts = value_counts.sort_index()
+    cumulative_counts = np.cumsum(value_counts.values)
+    total_count = cumulative_counts[-1]
+    lower_value = value_counts.index[np.searchsorted(cumulative_counts, (total_count - 1) // 2, side='right')]
+    upper_value = value_counts.index[np.searchsorted(cumulative_counts, total_count // 2, side='right')]
+    if value_counts.index.dtype.kind in 'Mm':
+        return lower_value + (upper_value - lower_value) / 2
+    return (float(lower_value) + float(upper_value)) / 2.
+
+
+def _mode_from_counts(value_counts):
+    """Computes the mode of a column from its value counts, mirroring `pandas.Series.mode()[0]`"""
+    most_frequent = value_counts[value_counts == value_counts.max()]
+    return most_frequent.index.sort_values()[0]
+
+
+def _fill_values_from_summary(summary):
+    """Computes the fill values and category vocabularies of all columns from a merged summary
+
+    Numerical, datetime, and timedelta columns are filled with their median and all other columns with their
+    mode, like `autoclean()` does. Columns with the object dtype are encoded by their position in the sorted vocabulary, which gives the
+    same codes as LabelEncoder.
+
+    Parameters
+    ----------
+    summary: dict
+        Summary of all chunks or partitions of the data set, as merged by `_merge_summaries()`
+
+    Returns
+    ----------
+    fill_values: dict
+        Maps each column to the value that replaces its NaNs
+    fill_errors: dict
+        Maps each column whose median was estimated with a sketch to its achieved rank error
+    encoding_indexes: dict
+        Maps each categorical column to the pandas.Index of its sorted vocabulary
+
+    """
+    fill_values = {}
+    fill_errors = {}
+    encoding_indexes = {}
+    for column, (dtype, value_counts, quantile_sketch) in summary.items():
+        if quantile_sketch is not None:
+            fill_values[column] = quantile_sketch.median()
+            fill_errors[column] = quantile_sketch.achieved_error
+        elif dtype.kind in 'biufcMm':
+            fill_values[column] = _median_from_counts(value_counts)
+        elif len(value_counts) > 0:
+            fill_values[column] = _mode_from_counts(value_counts)
+            if dtype == np.dtype('object'):
+                encoding_indexes[column] = pd.Index(np.unique(value_counts.index.values))
+    return fill_values, fill_errors, encoding_indexes
+
+
+def _clean_chunk(chunk, fill_values, encoding_indexes):
+    """Replaces the NaNs of a chunk or partition and encodes its categorical columns with global statistics"""
+    chunk = chunk.fillna(fill_values)
+    for column, encoding_index in encoding_indexes.items():
+        chunk[column] = encoding_index.get_indexer(chunk[column].values)
+    return chunk
+
+
+def _all_instances(values, types):
+    """Returns whether every one of the values is an instance of the given type or types"""
+    return all(isinstance(value, types) for value in values)
+
+
+def _read_chunks(filename, sep, chunksize, dtype=None):
+    """Lazily reads a delimited data file in chunks of `chunksize` rows"""
+    return pd.read_csv(filename, sep=sep, chunksize=chunksize, dtype=dtype)
+
+
+def autoclean_chunked(input_filename, output_filename, chunksize, drop_nans=False, input_separator='\t',
+                      output_separator='\t', ignore_update_check=False, profiler=None, approximate_error=None):
+    """Performs the same cleaning transformations as `autoclean()` on a data file that is too large to fit in memory
+
+    The data file is read twice in chunks of `chunksize` rows. The first pass gathers the value counts of every
+    column, from which the medians, modes, and category encodings are computed. The second pass replaces the
+    NaNs, encodes the categorical columns, and appends each cleaned chunk to the output file.
+
+    Besides one chunk, the first pass keeps the value counts of every column, so its memory use grows with the
+    number of distinct values per column. That is small for categorical and integer columns, but for columns of
+    continuous floats it can approach the size of the file. With `approximate_error`, the numerical columns are
+    summarized with fixed-size sketches instead, and the peak memory use depends only on the chunk size and the
+    number of distinct values of the non-numerical columns.
+
+    Parameters
+    ----------
+    input_filename: str
+        File name of the data file to clean
+    output_filename: str
+        File name to output the cleaned data set to
+    chunksize: int
+        Number of rows to read into memory at a time
+    drop_nans: bool
+        Drop all rows that have a NaN in any column (default: False)
+    input_separator: str
+        Column separator for the input file (default: \\t)
+    output_separator: str
+        Column separator for the output file (default: \\t)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    profiler: datacleaner.Profiler
+        Records the wall time and memory use of every pass over the data file (default: None)
+    approximate_error: float
+        Estimate the medians of the numerical columns with mergeable sketches instead of their value counts,
+        so that the first pass needs a fixed amount of memory per column. The rank error of every median is at
+        most this fraction of the rows (default: None)
+
+    Returns
+    ----------
+    fill_errors: dict
+        Maps each numerical column to the achieved rank error of its median; empty without `approximate_error`
+
+    """
+    _check_for_updates(ignore_update_check)
+
+    # The column types are inferred separately for every chunk, so a column with strings in only some of the
+    # chunks (e.g. numbers or booleans in the others) has to be summarized again with all of its values read as
+    # strings, like pandas would for the full file
+    column_dtypes = None
+    while True:
+        with _stage(profiler, 'summarize', column_dtypes):
+            summary = _reduce_summaries(
+                _summarize_chunk(chunk.dropna() if drop_nans else chunk, approximate_error)
+                for chunk in _read_chunks(input_filename, input_separator, chunksize, dtype=column_dtypes))
+
+        object_columns = [column for column, (dtype, value_counts, _) in summary.items()
+                          if dtype == np.dtype('object') and
+                          (value_counts is None or not (_all_instances(value_counts.index.values, str) or
+                                                        _all_instances(value_counts.index.values, (bool, np.bool_))))]
+        if len(object_columns) == 0 or column_dtypes is not None:
+            break
+        column_dtypes = {column: str for column in object_columns}
+
+    with _stage(profiler, 'fill_values', list(summary)):
+        fill_values, fill_errors, encoding_indexes = _fill_values_from_summary(summary)
+    final_dtypes = dict((column, dtype) for column, (dtype, _, _) in summary.items())
+
+    write_header = True
+    with _stage(profiler, 'clean_chunks', list(summary)):
+        for chunk in _read_chunks(input_filename, input_separator, chunksize, dtype=final_dtypes):
+            if drop_nans:
+                chunk = chunk.dropna()
+            chunk = _clean_chunk(chunk, fill_values, encoding_indexes)
+            chunk.to_csv(output_filename, sep=output_separator, index=False,
+                         header=write_header, mode='w' if write_header else 'a')
+            write_header = False
+
+    return fill_errors
+
+
+_FILE_FORMATS_BY_EXTENSION = {'.parquet': 'parquet', '.pq': 'parquet',
+                               '.feather': 'feather', '.arrow': 'feather', '.ipc': 'feather', '.npy': 'npy'}
+
+
+def _file_format(filename, file_format=None):
+    """Returns the format of a data file: `file_format` if given, otherwise inferred from its extension"""
+    if file_format is not None:
+        return file_format
+    return _FILE_FORMATS_BY_EXTENSION.get(os.path.splitext(filename)[1].lower(), 'csv')
+
+
+def _read_data(filename, sep='\t', file_format=None, columns=None):
+    """Reads a data file that is either delimited text, Parquet, or Feather (Arrow IPC)
+
+    Parameters
+    ----------
+    filename: str
+        File name of the data file
+    sep: str
+        Column separator if the data file is delimited text (default: \\t)
+    file_format: str
+        'csv', 'parquet', or 'feather'; inferred from the file extension if None (default: None)
+    columns: list
+        Only read these columns from the data file; columnar formats skip the other columns entirely (default: None)
+
+    Returns
+    ----------
+    input_dataframe: pandas.DataFrame
+        Data set read from the file
+
+    """
+    file_format = _file_format(filename, file_format)
+    if file_format == 'parquet':
+        return pd.read_parquet(filename, columns=columns)
+    if file_format == 'feather':
+        return pd.read_feather(filename, columns=columns)
+    return pd.read_csv(filename, sep=sep, usecols=columns)
+
+
+def _write_data(output_dataframe, filename, sep='\t', file_format=None):
+    """Writes a data set to a file that is either delimited text, Parquet, Feather (Arrow IPC), or .npy
+
+    Columnar formats are written through Arrow, which shares the memory of NumPy-backed numerical columns
+    instead of copying them. .npy files are written with `write_npy()`.
+
+    Parameters
+    ----------
+    output_dataframe: pandas.DataFrame
+        Data set to write
+    filename: str
+        File name of the data file
+    sep: str
+        Column separator if the data file is delimited text (default: \\t)
+    file_format: str
+        'csv', 'parquet', 'feather', or 'npy'; inferred from the file extension if None (default: None)
+
+    Returns
+    ----------
+    None
+
+    """
+    file_format = _file_format(filename, file_format)
+    if file_format == 'npy':
+        write_npy(output_dataframe, filename)
+        return
+    if file_format == 'csv':
+        output_dataframe.to_csv(filename, sep=sep, index=False)
+        return
+
+    import pyarrow as pa
+    table = pa.Table.from_pandas(output_dataframe, preserve_index=False)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, filename)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, filename)
+
+
+def _print_fill_errors(fill_errors, medians_only=False):
+    """Prints the largest achieved error of the approximate fill values, if there are any
+
+    Chunked and partitioned cleaning only estimate the medians and compute the modes exactly, which
+    `medians_only` states in the message.
+    """
+    if fill_errors:
+        print('Approximate {} off by at most {:.4%} of the rows.'.format(
+            'medians are' if medians_only else 'medians and modes are', max(fill_errors.values())))
 
 
 def main():
     """Main function that is called when datacleaner is run on the command line"""
     parser = argparse.ArgumentParser(description='A Python tool that automatically cleans data sets and readies them for analysis')
 
-    parser.add_argument('INPUT_FILENAME', type=str, help='File name of the data file to clean')
+    parser.add_argument('INPUT_FILENAME', type=str,
+                        help='File name of the data file to clean, or a directory of Parquet files that are the '
+                             'partitions of the data set, or with --batch a glob pattern or manifest of data files')
 
-    parser.add_argument('-cv', action='store', dest='CROSS_VAL_FILENAME', default=None,
-                         type=str, help='File name for the validation data set if performing cross-validation')
+    parser.add_argument('-cv', action='append', dest='CROSS_VAL_FILENAME', default=None,
+                        type=str, help='File name for the validation data set if performing cross-validation; '
+                                       'repeat to clean several validation data sets with the same transformations')
 
     parser.add_argument('-o', action='store', dest='OUTPUT_FILENAME', default=None,
                         type=str, help='Data file to output the cleaned data set to')
 
-    parser.add_argument('-cvo', action='store', dest='CV_OUTPUT_FILENAME', default=None,
-                        type=str, help='Data file to output the cleaned cross-validation data set to')
+    parser.add_argument('-cvo', action='append', dest='CV_OUTPUT_FILENAME', default=None,
+                        type=str, help='Data file to output the cleaned cross-validation data set to; repeat once '
+                                       'for every -cv file, in the same order')
 
     parser.add_argument('-is', action='store', dest='INPUT_SEPARATOR', default='\t',
                         type=str, help='Column separator for the input file(s) (default: \\t)')
@@ -198,6 +1463,61 @@ def main():
     parser.add_argument('-os', action='store', dest='OUTPUT_SEPARATOR', default='\t',
                         type=str, help='Column separator for the output file(s) (default: \\t)')
 
+    parser.add_argument('--format', action='store', dest='FILE_FORMAT', default=None,
+                        choices=['csv', 'parquet', 'feather'],
+                        help='Format of the input and output files (default: inferred from the file extensions, '
+                             'otherwise csv)')
+
+    parser.add_argument('--columns', action='store', dest='COLUMNS', default=None, type=str,
+                        help='Comma-separated list of the columns to read from the input file(s) (default: all)')
+
+    parser.add_argument('--chunksize', action='store', dest='CHUNKSIZE', default=None, type=int,
+                        help='Clean the data file in chunks of this many rows instead of loading it into memory at once')
+
+    parser.add_argument('--n-jobs', action='store', dest='N_JOBS', default=1, type=int,
+                        help='Number of parallel jobs to clean the columns with; -1 uses all CPU cores (default: 1)')
+
+    parser.add_argument('--handle-unknown', action='store', dest='HANDLE_UNKNOWN', default='error',
+                        choices=['error', 'unknown', 'mode'],
+                        help='What to do with categories in the cross-validation data set that are not in the '
+                             'training data set (default: error)')
+
+    parser.add_argument('--downcast', action='store_true', dest='DOWNCAST', default=False,
+                        help='Store every cleaned column in the smallest dtype that holds its values exactly; not '
+                             'supported with --batch, --chunksize, or partitioned data sets (default: False)')
+
+    parser.add_argument('--max-categories', action='store', dest='MAX_CATEGORIES', default=0, type=int,
+                        help='With --downcast, convert float and string columns with at most this many distinct '
+                             'values to categories (default: 0)')
+
+    parser.add_argument('--approximate-error', action='store', dest='APPROXIMATE_ERROR', default=None, type=float,
+                        help='Estimate the medians and modes with sketches whose rank or frequency error is at most '
+                             'this fraction of the rows instead of computing them exactly (default: exact)')
+
+    parser.add_argument('--coerce-threshold', action='store', dest='COERCE_THRESHOLD', default=None, type=float,
+                        help='Convert text columns to numbers (or else dates) if at least this fraction of a sample '
+                             'of their values parses as such, e.g. 0.95; not supported with --chunksize or '
+                             'partitioned data sets (default: no conversion)')
+
+    parser.add_argument('--cache-dir', action='store', dest='CACHE_DIR', default=None, type=str,
+                        help='Directory of a cache for the transformations learned from the training data set, '
+                             'so that cleaning the same training data again with -cv skips learning them')
+
+    parser.add_argument('--profile', action='store', dest='PROFILE_FILENAME', default=None, type=str,
+                        help='Write a JSON report of the wall time and memory use of every cleaning stage to this file')
+
+    parser.add_argument('--batch', action='store_true', dest='BATCH', default=False,
+                        help='Clean a batch of data files: INPUT_FILENAME is either a glob pattern (quoted) whose '
+                             'files are written to the -o directory, or a manifest file with one input and output '
+                             'file name per line, separated by a tab (default: False)')
+
+    parser.add_argument('--workers', action='store', dest='WORKERS', default=4, type=int,
+                        help='With --batch, number of files to read, clean, and write at the same time (default: 4)')
+
+    parser.add_argument('--fit', action='store', dest='FIT_FILENAME', default=None, type=str,
+                        help='With --batch, learn the transformations from this data file once and apply them to '
+                             'every file of the batch instead of cleaning every file on its own')
+
     parser.add_argument('--drop-nans', action='store_true', dest='DROP_NANS', default=False,
                         help='Drop all rows that have a NaN in any column (default: False)')
                         
@@ -208,9 +1528,127 @@ def main():
 
     args = parser.parse_args()
 
-    input_data = pd.read_csv(args.INPUT_FILENAME, sep=args.INPUT_SEPARATOR)
+    columns = None
+    if args.COLUMNS is not None:
+        columns = args.COLUMNS.split(',')
+
+    profiler = None
+    if args.PROFILE_FILENAME is not None:
+        from .profiling import Profiler
+        profiler = Profiler()
+
+    if args.BATCH:
+        if args.CROSS_VAL_FILENAME is not None or args.CHUNKSIZE is not None or profiler is not None or \
+                args.DOWNCAST:
+            print('Batch cleaning does not support cross-validation data sets, chunks, profiling, or downcasting. '
+                  'Type datacleaner --help for more information.')
+            return
+
+        from .batch import _batch_file_pairs, autoclean_batch
+        try:
+            file_pairs = _batch_file_pairs(args.INPUT_FILENAME, args.OUTPUT_FILENAME)
+        except (IOError, OSError, ValueError) as error:
+            print('{} Type datacleaner --help for more information.'.format(error))
+            return
+
+        cleaner = None
+        if args.FIT_FILENAME is not None:
+            from .cleaner import DataCleaner
+            fit_data = _read_data(args.FIT_FILENAME, sep=args.INPUT_SEPARATOR, file_format=args.FILE_FORMAT,
+                                  columns=columns)
+            if args.DROP_NANS:
+                fit_data = fit_data.dropna()
+            cleaner = DataCleaner(copy=False, ignore_update_check=True, n_jobs=args.N_JOBS,
+                                  handle_unknown=args.HANDLE_UNKNOWN, approximate_error=args.APPROXIMATE_ERROR,
+                                  cache_dir=args.CACHE_DIR, coerce_threshold=args.COERCE_THRESHOLD).fit(fit_data)
+            del fit_data
+
+        progress = {'done': 0}
+
+        def print_progress(input_filename, output_filename, seconds, error):
+            progress['done'] += 1
+            if error is None:
+                print('[{}/{}] Cleaned {} into {} in {:.2f} s'.format(progress['done'], len(file_pairs),
+                                                                    input_filename, output_filename, seconds))
+            else:
+                print('[{}/{}] Failed to clean {}: {}: {}'.format(progress['done'], len(file_pairs), input_filename,
+                                                                 type(error).__name__, error))
+            sys.stdout.flush()
+
+        errors = autoclean_batch(file_pairs, cleaner=cleaner, n_jobs=args.WORKERS, drop_nans=args.DROP_NANS,
+                                 input_separator=args.INPUT_SEPARATOR, output_separator=args.OUTPUT_SEPARATOR,
+                                 file_format=args.FILE_FORMAT, columns=columns,
+                                 ignore_update_check=args.IGNORE_UPDATE_CHECK,
+                                 coerce_threshold=args.COERCE_THRESHOLD, callback=print_progress)
+        print('Cleaned {} of {} files.'.format(len(file_pairs) - len(errors), len(file_pairs)))
+        if errors:
+            sys.exit(1)
+        return
+
+    if args.COERCE_THRESHOLD is not None and (os.path.isdir(args.INPUT_FILENAME) or args.CHUNKSIZE is not None):
+        print('Partitioned and chunked cleaning do not support --coerce-threshold yet. '
+              'Type datacleaner --help for more information.')
+        return
+
+    if args.DOWNCAST and (os.path.isdir(args.INPUT_FILENAME) or args.CHUNKSIZE is not None):
+        print('Partitioned and chunked cleaning do not support --downcast yet. '
+              'Type datacleaner --help for more information.')
+        return
+
+    if os.path.isdir(args.INPUT_FILENAME):
+        if args.OUTPUT_FILENAME is None or args.CROSS_VAL_FILENAME is not None:
+            print('A partitioned data set must be cleaned into an output directory and without a cross-validation '
+                  'data set. Type datacleaner --help for more information.')
+            return
+
+        from .partitioned import autoclean_partitioned
+        fill_errors = autoclean_partitioned(args.INPUT_FILENAME, args.OUTPUT_FILENAME, drop_nans=args.DROP_NANS,
+                                            n_jobs=args.N_JOBS, ignore_update_check=args.IGNORE_UPDATE_CHECK,
+                                            profiler=profiler, approximate_error=args.APPROXIMATE_ERROR)
+        _print_fill_errors(fill_errors, medians_only=True)
+        if profiler is not None:
+            profiler.to_json(args.PROFILE_FILENAME)
+        return
+
+    if args.CHUNKSIZE is not None:
+        if _file_format(args.INPUT_FILENAME, args.FILE_FORMAT) != 'csv' or \
+                _file_format(args.OUTPUT_FILENAME or '', args.FILE_FORMAT) != 'csv' or columns is not None:
+            print('Chunked cleaning only supports delimited text files with all of their columns. '
+                  'Type datacleaner --help for more information.')
+            return
+
+        if args.CROSS_VAL_FILENAME is not None:
+            print('Chunked cleaning does not support cross-validation data sets yet. '
+                  'Type datacleaner --help for more information.')
+            return
+
+        if args.OUTPUT_FILENAME is None:
+            print('You must specify an output file name when cleaning in chunks. '
+                  'Type datacleaner --help for more information.')
+            return
+
+        fill_errors = autoclean_chunked(args.INPUT_FILENAME, args.OUTPUT_FILENAME, args.CHUNKSIZE,
+                                        drop_nans=args.DROP_NANS, input_separator=args.INPUT_SEPARATOR,
+                                        output_separator=args.OUTPUT_SEPARATOR,
+                                        ignore_update_check=args.IGNORE_UPDATE_CHECK, profiler=profiler,
+                                        approximate_error=args.APPROXIMATE_ERROR)
+        _print_fill_errors(fill_errors, medians_only=True)
+        if profiler is not None:
+            profiler.to_json(args.PROFILE_FILENAME)
+        return
+
+    with _stage(profiler, 'read'):
+        input_data = _read_data(args.INPUT_FILENAME, sep=args.INPUT_SEPARATOR, file_format=args.FILE_FORMAT,
+                                columns=columns)
     if args.CROSS_VAL_FILENAME is None:
-        clean_data = autoclean(input_data, drop_nans=args.DROP_NANS, ignore_update_check=args.IGNORE_UPDATE_CHECK)
+        clean_data = autoclean(input_data, drop_nans=args.DROP_NANS, ignore_update_check=args.IGNORE_UPDATE_CHECK,
+                               n_jobs=args.N_JOBS, profiler=profiler, approximate_error=args.APPROXIMATE_ERROR,
+                               coerce_threshold=args.COERCE_THRESHOLD)
+        _print_fill_errors(clean_data.attrs.get('fill_errors'))
+        if args.DOWNCAST:
+            with _stage(profiler, 'downcast', rows=len(clean_data)):
+                bytes_saved = downcast_dataframe(clean_data, max_categories=args.MAX_CATEGORIES)
+            print('Downcasting saved {} bytes.'.format(bytes_saved))
         if args.OUTPUT_FILENAME is None:
             print('Cleaned data set:')
             print(clean_data)
@@ -218,29 +1656,55 @@ def main():
             print('If you cannot view the entire data set, output it to a file instead. '
                   'Type datacleaner --help for more information.')
         else:
-            clean_data.to_csv(args.OUTPUT_FILENAME, sep=args.OUTPUT_SEPARATOR, index=False)
+            with _stage(profiler, 'write', rows=len(clean_data)):
+                _write_data(clean_data, args.OUTPUT_FILENAME, sep=args.OUTPUT_SEPARATOR,
+                            file_format=args.FILE_FORMAT)
     else:
-        if args.OUTPUT_FILENAME is not None and args.CV_OUTPUT_FILENAME is None:
-            print('You must specify both output file names. Type datacleaner --help for more information.')
+        if args.OUTPUT_FILENAME is not None and len(args.CV_OUTPUT_FILENAME or []) != len(args.CROSS_VAL_FILENAME):
+            print('You must specify an output file name for the training data set and one for every '
+                  'cross-validation data set. Type datacleaner --help for more information.')
             return
-    
-        cross_val_data = pd.read_csv(args.CROSS_VAL_FILENAME, sep=args.INPUT_SEPARATOR)
-        clean_training_data, clean_testing_data = autoclean_cv(input_data, cross_val_data,
-                                                               drop_nans=args.DROP_NANS,
-                                                               ignore_update_check=args.IGNORE_UPDATE_CHECK)
+
+        cross_val_data = []
+        for cross_val_filename in args.CROSS_VAL_FILENAME:
+            with _stage(profiler, 'read'):
+                cross_val_data.append(_read_data(cross_val_filename, sep=args.INPUT_SEPARATOR,
+                                                 file_format=args.FILE_FORMAT, columns=columns))
+        clean_training_data, clean_testing_data = autoclean_splits(input_data, cross_val_data,
+                                                                   drop_nans=args.DROP_NANS,
+                                                                   ignore_update_check=args.IGNORE_UPDATE_CHECK,
+                                                                   n_jobs=args.N_JOBS,
+                                                                   handle_unknown=args.HANDLE_UNKNOWN,
+                                                                   profiler=profiler,
+                                                                   approximate_error=args.APPROXIMATE_ERROR,
+                                                                   cache_dir=args.CACHE_DIR,
+                                                                   coerce_threshold=args.COERCE_THRESHOLD)
+        _print_fill_errors(clean_training_data.attrs.get('fill_errors'))
+        all_clean_data = [clean_training_data] + clean_testing_data
+        if args.DOWNCAST:
+            with _stage(profiler, 'downcast', rows=sum(len(clean_data) for clean_data in all_clean_data)):
+                # Every split gets the same dtypes, which hold the values of all of them
+                new_dtypes = _downcast_dtypes(all_clean_data, max_categories=args.MAX_CATEGORIES)
+                bytes_saved = sum(_apply_dtypes(clean_data, new_dtypes) for clean_data in all_clean_data)
+            print('Downcasting saved {} bytes.'.format(bytes_saved))
 
         if args.OUTPUT_FILENAME is None:
             print('Cleaned training data set:')
             print(clean_training_data)
             print('')
-            print('Cleaned testing data set:')
-            print(clean_testing_data)
-            print('')
+            for cross_val_filename, clean_data in zip(args.CROSS_VAL_FILENAME, clean_testing_data):
+                print('Cleaned testing data set {}:'.format(cross_val_filename))
+                print(clean_data)
+                print('')
             print('If you cannot view the entire data set, output it to a file instead. '
                   'Type datacleaner --help for more information.')
         else:
-            clean_training_data.to_csv(args.OUTPUT_FILENAME, sep=args.OUTPUT_SEPARATOR, index=False)
-            clean_testing_data.to_csv(args.OUTPUT_FILENAME, sep=args.OUTPUT_SEPARATOR, index=False)
+            for output_filename, clean_data in zip([args.OUTPUT_FILENAME] + args.CV_OUTPUT_FILENAME, all_clean_data):
+                with _stage(profiler, 'write', rows=len(clean_data)):
+                    _write_data(clean_data, output_filename, sep=args.OUTPUT_SEPARATOR, file_format=args.FILE_FORMAT)
+
+    if profiler is not None:
+        profiler.to_json(args.PROFILE_FILENAME)
 
 if __name__ == '__main__':
     main()
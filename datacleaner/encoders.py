@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import print_function
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+from .datacleaner import _smallest_integer_dtype
+
+
+class FactorizeEncoder(BaseEstimator, TransformerMixin):
+    """Encodes a categorical column with numerical equivalents using hash tables instead of sorting
+
+    Unlike LabelEncoder, which sorts all of the values to find the categories and then searches the sorted
+    categories for every value, FactorizeEncoder finds the categories and codes in a single hashing pass with
+    `pandas.factorize()`. The codes are stored in the smallest integer dtype that can hold them. NaNs and values
+    that were not seen during `fit()` are encoded as -1 (or NaN when `as_category` is True).
+
+    Parameters
+    ----------
+    sort: bool
+        Number the categories in sorted order, which gives the same codes as LabelEncoder,
+        instead of in order of appearance (default: False)
+    as_category: bool
+        Return the codes as a pandas Categorical instead of a NumPy array (default: True)
+
+    Attributes
+    ----------
+    classes_: numpy.ndarray
+        Categories of the column, in the order of their codes
+
+    """
+
+    def __init__(self, sort=False, as_category=True):
+        self.sort = sort
+        self.as_category = as_category
+
+    def fit(self, values):
+        """Learns the categories of a column
+
+        Parameters
+        ----------
+        values: array-like
+            Values of the column
+
+        Returns
+        ----------
+        self: FactorizeEncoder
+            The fitted FactorizeEncoder
+
+        """
+        self.fit_transform(values)
+        return self
+
+    def fit_transform(self, values):
+        """Learns the categories of a column and encodes it in the same hashing pass
+
+        Parameters
+        ----------
+        values: array-like
+            Values of the column
+
+        Returns
+        ----------
+        codes: numpy.ndarray or pandas.Categorical
+            Encoded values of the column
+
+        """
+        codes, categories = pd.factorize(values, sort=self.sort)
+        self.classes_ = np.asarray(categories)
+        self._category_index = pd.Index(categories)
+        return self._format_codes(codes)
+
+    def transform(self, values):
+        """Encodes a column with the categories learned by `fit()`
+
+        Parameters
+        ----------
+        values: array-like
+            Values of the column
+
+        Returns
+        ----------
+        codes: numpy.ndarray or pandas.Categorical
+            Encoded values of the column
+
+        """
+        check_is_fitted(self, 'classes_')
+        return self._format_codes(self._category_index.get_indexer(values))
+
+    def _format_codes(self, codes):
+        """Converts the codes to the smallest integer dtype, optionally wrapped in a Categorical"""
+        if self.as_category:
+            return pd.Categorical.from_codes(codes, categories=np.arange(len(self.classes_)))
+        return codes.astype(_smallest_integer_dtype(-1, len(self.classes_) - 1), copy=False)
+
+    def __getstate__(self):
+        # The category index is rebuilt from classes_ when the encoder is unpickled
+        state = super(FactorizeEncoder, self).__getstate__().copy()
+        state.pop('_category_index', None)
+        return state
+
+    def __setstate__(self, state):
+        super(FactorizeEncoder, self).__setstate__(state)
+        if 'classes_' in state:
+            self._category_index = pd.Index(self.classes_)
+
+
+class _FrameEncoder(BaseEstimator, TransformerMixin):
+    """Base class of the encoders that encode all categorical columns of a DataFrame in a single pass
+
+    The values of all columns are stacked into one array and factorized together with a single hashing pass,
+    so every (column, category) pair gets an integer key. The keys are grouped and counted with a second hashing
+    pass, and encoding a DataFrame looks up the keys of all of its values at once. NaNs are counted like any
+    other category. `autoclean()` and `DataCleaner`
+    fit one such encoder on all categorical columns together instead of one encoder per column.
+
+    The base class encodes every category by its position in `categories_[column]`, and subclasses override
+    `_encode()` to encode the categories differently.
+
+    Parameters
+    ----------
+    handle_unknown: str
+        What to do with categories that were not seen during `fit()`: 'value' encodes them as 0 (or -1, or
+        with no indicator set), 'mode' encodes them like the most frequent category of their column, and
+        'error' raises an error (default: 'value')
+
+    Attributes
+    ----------
+    columns_: list
+        Columns that the encoder was fitted on
+    n_samples_seen_: int
+        Number of rows that the encoder was fitted on
+    categories_: dict
+        Maps each column to a numpy.ndarray of its categories
+    counts_: dict
+        Maps each column to the number of times each of its categories was seen
+
+    """
+
+    # Tells autoclean() and DataCleaner to fit a single encoder on a DataFrame of all categorical columns
+    encodes_frame = True
+
+    def __init__(self, handle_unknown='value'):
+        self.handle_unknown = handle_unknown
+
+    @staticmethod
+    def _stack(X, columns):
+        """Returns the values of the columns stacked into one array, and the position of the column of each"""
+        values = np.concatenate([X[column].to_numpy(dtype=object) for column in columns] +
+                                [np.array([], dtype=object)])
+        column_positions = np.repeat(np.arange(len(columns), dtype=np.int64), len(X))
+        return values, column_positions
+
+    def fit(self, X, y=None):
+        """Learns the categories of every column and how often each of them occurs
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Categorical columns to encode
+        y: None
+            Ignored
+
+        Returns
+        ----------
+        self: _FrameEncoder
+            The fitted encoder
+
+        """
+        self._fit(X)
+        return self
+
+    def fit_transform(self, X, y=None):
+        """Learns the categories of every column and encodes the columns in the same pass; see `transform()`"""
+        return self._encode(self._fit(X), len(X))
+
+    def transform(self, X):
+        """Encodes the categorical columns that the encoder was fitted on
+
+        Parameters
+        ----------
+        X: pandas.DataFrame
+            Data set with the columns that the encoder was fitted on
+
+        Returns
+        ----------
+        encoded: pandas.DataFrame or scipy.sparse.csr_matrix
+            Encoded columns
+
+        """
+        check_is_fitted(self, 'columns_')
+
+        values, column_positions = self._stack(X, self.columns_)
+        codes = self._value_index.get_indexer(values)
+        unmatched = codes < 0
+        if unmatched.any():
+            # NaNs have the code after the last category; all other unmatched values are unknown
+            codes[unmatched] = np.where(pd.isna(values[unmatched]), len(self._value_index), -1)
+        keys = column_positions * (len(self._value_index) + 1) + codes
+        positions = self._key_index.get_indexer(keys)
+        positions[codes < 0] = -1
+        unknown = positions < 0
+        if self.handle_unknown == 'error' and unknown.any():
+            raise ValueError('The DataFrame has categories that were not seen during fit: '
+                             '{}'.format(list(pd.unique(values[unknown]))[:10]))
+        elif self.handle_unknown == 'mode':
+            positions[unknown] = self._mode_positions[column_positions[unknown]]
+        return self._encode(positions, len(X))
+
+    def _fit(self, X):
+        """Fits the encoder and returns the position of the key of every stacked value"""
+        if self.handle_unknown not in ('value', 'mode', 'error'):
+            raise ValueError('handle_unknown must be one of \'value\', \'mode\', or \'error\', '
+                             'not {}.'.format(repr(self.handle_unknown)))
+
+        self.columns_ = list(X.columns.values)
+        self.n_samples_seen_ = len(X)
+        values, column_positions = self._stack(X, self.columns_)
+        codes, uniques = pd.factorize(values)
+        # NaNs get the code after the last category, so that they are counted like any other category
+        codes[codes < 0] = len(uniques)
+        uniques = np.append(np.asarray(uniques, dtype=object), np.array([np.nan], dtype=object))
+        keys = column_positions * len(uniques) + codes
+
+        # Group the values by key with a hashing pass, then number the keys in sorted order so that the keys
+        # of every column are next to each other
+        key_codes, key_values = pd.factorize(keys)
+        key_counts = np.bincount(key_codes, minlength=len(key_values))
+        key_order = np.argsort(key_values)
+        key_ranks = np.empty_like(key_order)
+        key_ranks[key_order] = np.arange(len(key_order))
+        key_values = key_values[key_order]
+        key_counts = key_counts[key_order]
+
+        self._value_index = pd.Index(uniques[:-1], dtype=object)
+        self._key_index = pd.Index(key_values)
+        self._key_counts = key_counts
+        key_columns = key_values // len(uniques)
+        self.categories_ = {}
+        self.counts_ = {}
+        # The keys of every column start at its offset; the mode position of a column without keys is never used
+        self._column_offsets = np.searchsorted(key_columns, np.arange(len(self.columns_)))
+        self._mode_positions = np.zeros(len(self.columns_), dtype=np.int64)
+        for column_position, column in enumerate(self.columns_):
+            column_keys = key_columns == column_position
+            self.categories_[column] = uniques[key_values[column_keys] % len(uniques)]
+            self.counts_[column] = key_counts[column_keys]
+            if len(self.counts_[column]) > 0:
+                self._mode_positions[column_position] = (self._column_offsets[column_position] +
+                                                         np.argmax(self.counts_[column]))
+        return key_ranks[key_codes]
+
+    def _encode(self, positions, n_rows):
+        """Encodes every category by its position among the categories of its column, or as -1 if it is unknown"""
+        positions = positions.reshape(len(self.columns_), n_rows).T
+        codes = np.where(positions >= 0, positions - self._column_offsets, -1)
+        return pd.DataFrame(codes, columns=self.columns_)
+
+    def _key_values(self, positions, fill_value):
+        """Looks up a value of every key, e.g. its count, as an n_rows x n_columns array"""
+        key_values = np.append(fill_value, np.array([0], dtype=fill_value.dtype))
+        return key_values[positions].reshape(len(self.columns_), -1).T
+
+
+class CountEncoder(_FrameEncoder):
+    """Encodes every category by the number of times it occurs in its column of the training data set
+
+    All categorical columns are encoded together in a single vectorized pass. Categories that were not in the
+    training data set are encoded as 0 if `handle_unknown` is 'value'. See `_FrameEncoder` for the parameters
+    and attributes.
+    """
+
+    def _encode(self, positions, n_rows):
+        return pd.DataFrame(self._key_values(positions, self._key_counts), columns=self.columns_)
+
+
+class FrequencyEncoder(_FrameEncoder):
+    """Encodes every category by the fraction of the rows of the training data set that it occurs in
+
+    All categorical columns are encoded together in a single vectorized pass. Categories that were not in the
+    training data set are encoded as 0 if `handle_unknown` is 'value'. See `_FrameEncoder` for the parameters
+    and attributes.
+    """
+
+    def _encode(self, positions, n_rows):
+        frequencies = self._key_counts / float(max(1, self.n_samples_seen_))
+        return pd.DataFrame(self._key_values(positions, frequencies), columns=self.columns_)
+
+
+class SparseOneHotEncoder(_FrameEncoder):
+    """Encodes every category as an indicator column of a scipy.sparse matrix
+
+    All categorical columns are encoded together in a single vectorized pass, into a CSR matrix with one column
+    per (column, category) pair of the training data set, grouped by column. Only one value per row and column
+    is stored, so columns with very many categories do not take up dense memory. In `autoclean()` and
+    `DataCleaner`, the indicator columns replace the categorical columns as sparse pandas columns named
+    'column=category'. Categories that were not in the training data set get no indicator if `handle_unknown`
+    is 'value'. See `_FrameEncoder` for the parameters and attributes.
+    """
+
+    def _encode(self, positions, n_rows):
+        import scipy.sparse
+        rows = np.tile(np.arange(n_rows, dtype=np.int64), len(self.columns_))
+        known = positions >= 0
+        return scipy.sparse.csr_matrix((np.ones(known.sum(), dtype=np.uint8), (rows[known], positions[known])),
+                                       shape=(n_rows, len(self._key_index)))
+
+    def get_feature_names_out(self, input_features=None):
+        """Returns the names of the indicator columns, 'column=category', in the order of the matrix columns"""
+        check_is_fitted(self, 'columns_')
+        return np.array(['{}={}'.format(column, category) for column in self.columns_
+                         for category in self.categories_[column]], dtype=object)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import print_function
+import os
+
+import numpy as np
+
+from .datacleaner import (_FILE_FORMATS_BY_EXTENSION, _check_for_updates, _clean_chunk, _fill_values_from_summary,
+                          _merge_summaries, _read_data, _reduce_summaries, _stage, _summarize_chunk, _write_data)
+
+
+def _partition_filenames(input_directory):
+    """Returns the relative file names of all Parquet files below a directory, in sorted order"""
+    partition_filenames = []
+    for directory, _, filenames in os.walk(input_directory):
+        for filename in filenames:
+            if _FILE_FORMATS_BY_EXTENSION.get(os.path.splitext(filename)[1].lower()) == 'parquet':
+                partition_filenames.append(os.path.relpath(os.path.join(directory, filename), input_directory))
+    return sorted(partition_filenames)
+
+
+def _summarize_partition(filename, drop_nans, approximate_error):
+    """Reads a single Parquet partition and returns its `_summarize_chunk()` summary"""
+    partition = _read_data(filename, file_format='parquet')
+    if drop_nans:
+        partition = partition.dropna()
+    return _summarize_chunk(partition, approximate_error)
+
+
+def _check_summary(summary):
+    """Raises a ValueError if a column holds numbers in some partitions and other values in others"""
+    mixed_columns = [column for column, (_, value_counts, quantile_sketch) in summary.items()
+                     if value_counts is None and quantile_sketch is None]
+    if len(mixed_columns) > 0:
+        raise ValueError('The partitions do not have the same column types. Make sure that the columns {} '
+                         'have the same type in every partition.'.format(mixed_columns))
+
+
+def _clean_partition(partition, column_dtypes, fill_values, encoding_indexes):
+    """Cleans a single partition with the global statistics of the data set"""
+    # A column without NaNs in this partition may still hold integers while the whole data set has floats
+    changed_dtypes = dict((column, dtype) for column, dtype in column_dtypes.items()
+                          if dtype.kind in 'iuf' and partition[column].dtype != dtype)
+    if len(changed_dtypes) > 0:
+        partition = partition.astype(changed_dtypes)
+    return _clean_chunk(partition, fill_values, encoding_indexes)
+
+
+def _clean_partition_file(input_filename, output_filename, column_dtypes, fill_values, encoding_indexes, drop_nans):
+    """Cleans a single Parquet partition with the global statistics and writes it to `output_filename`"""
+    partition = _read_data(input_filename, file_format='parquet')
+    if drop_nans:
+        partition = partition.dropna()
+
+    output_directory = os.path.dirname(output_filename)
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+    _write_data(_clean_partition(partition, column_dtypes, fill_values, encoding_indexes), output_filename,
+                file_format='parquet')
+
+
+def autoclean_partitioned(input_directory, output_directory, drop_nans=False, n_jobs=1, ignore_update_check=False,
+                          profiler=None, approximate_error=None):
+    """Performs the same cleaning transformations as `autoclean()` on a data set that is split into Parquet files
+
+    Every Parquet file below `input_directory` (e.g., as written by Dask or Spark) is one partition of the data
+    set. In the map step, each partition is summarized by the value counts of its columns. The summaries are
+    reduced into the global medians, modes, and category vocabularies, and then every partition is cleaned with
+    them and written to the same relative path below `output_directory`. Both steps process the partitions in
+    parallel with `n_jobs` jobs, and only `n_jobs` partitions are held in memory at a time. Concatenating the
+    output partitions in sorted file name order gives the same data set as `autoclean()` on the concatenated
+    input partitions.
+
+    Parameters
+    ----------
+    input_directory: str
+        Directory that holds the Parquet files of the data set
+    output_directory: str
+        Directory to write the cleaned Parquet files to
+    drop_nans: bool
+        Drop all rows that have a NaN in any column (default: False)
+    n_jobs: int
+        Number of partitions to process in parallel; -1 uses all CPU cores (default: 1)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    profiler: datacleaner.Profiler
+        Records the wall time and memory use of the map and the cleaning step (default: None)
+    approximate_error: float
+        Estimate the medians of the numerical columns with mergeable sketches instead of their value counts;
+        see `autoclean_chunked()` (default: None)
+
+    Returns
+    ----------
+    fill_errors: dict
+        Maps each numerical column to the achieved rank error of its median; empty without `approximate_error`
+
+    """
+    _check_for_updates(ignore_update_check)
+
+    from joblib import Parallel, delayed
+    partition_filenames = _partition_filenames(input_directory)
+    if len(partition_filenames) == 0:
+        raise ValueError('There are no Parquet files in {}.'.format(input_directory))
+
+    with _stage(profiler, 'summarize'):
+        summary = _reduce_summaries(Parallel(n_jobs=n_jobs, return_as='generator')(
+            delayed(_summarize_partition)(os.path.join(input_directory, filename), drop_nans, approximate_error)
+            for filename in partition_filenames))
+    _check_summary(summary)
+
+    with _stage(profiler, 'fill_values', list(summary)):
+        fill_values, fill_errors, encoding_indexes = _fill_values_from_summary(summary)
+    column_dtypes = dict((column, dtype) for column, (dtype, _, _) in summary.items())
+
+    with _stage(profiler, 'clean_partitions', list(summary)):
+        Parallel(n_jobs=n_jobs)(
+            delayed(_clean_partition_file)(os.path.join(input_directory, filename),
+                                           os.path.join(output_directory, filename),
+                                           column_dtypes, fill_values, encoding_indexes, drop_nans)
+            for filename in partition_filenames)
+
+    return fill_errors
+
+
+def autoclean_dask(input_dataframe, drop_nans=False, ignore_update_check=False, approximate_error=None):
+    """Performs the same cleaning transformations as `autoclean()` on a Dask DataFrame
+
+    The partitions are summarized and the summaries are merged in a tree reduction, which computes the global
+    medians, modes, and category vocabularies on whichever Dask scheduler is active. The returned Dask DataFrame
+    cleans every partition with those statistics lazily, so it can be computed or written in parallel, and it
+    holds the same data as `autoclean()` on the computed input DataFrame.
+
+    Parameters
+    ----------
+    input_dataframe: dask.dataframe.DataFrame
+        Data set to clean
+    drop_nans: bool
+        Drop all rows that have a NaN in any column (default: False)
+    ignore_update_check: bool
+        Do not check for the latest version of datacleaner
+    approximate_error: float
+        Estimate the medians of the numerical columns with mergeable sketches instead of their value counts;
+        see `autoclean_chunked()` (default: None)
+
+    Returns
+    ----------
+    output_dataframe: dask.dataframe.DataFrame
+        Cleaned data set
+    fill_errors: dict
+        Maps each numerical column to the achieved rank error of its median; empty without `approximate_error`
+
+    """
+    _check_for_updates(ignore_update_check)
+
+    import dask
+
+    if drop_nans:
+        input_dataframe = input_dataframe.dropna()
+
+    summaries = [dask.delayed(_summarize_chunk)(partition, approximate_error)
+                 for partition in input_dataframe.to_delayed()]
+    while len(summaries) > 1:
+        summaries = [dask.delayed(_merge_summaries)(*summaries[i:i + 2]) if i + 1 < len(summaries) else summaries[i]
+                     for i in range(0, len(summaries), 2)]
+    summary = summaries[0].compute()
+    _check_summary(summary)
+
+    fill_values, fill_errors, encoding_indexes = _fill_values_from_summary(summary)
+    column_dtypes = dict((column, dtype) for column, (dtype, _, _) in summary.items())
+
+    output_meta = _clean_partition(input_dataframe._meta, column_dtypes, {}, {})
+    for column in encoding_indexes:
+        output_meta[column] = output_meta[column].astype(np.intp)
+
+    output_dataframe = input_dataframe.map_partitions(_clean_partition, column_dtypes, fill_values, encoding_indexes,
+                                                      meta=output_meta)
+    return output_dataframe, fill_errors
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import print_function
+import contextlib
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+_RECORD_FIELDS = ['stage', 'columns', 'rows', 'seconds', 'memory_bytes']
+
+
+class Profiler(object):
+    """Records the wall time and memory use of every stage of a data cleaning run
+
+    Pass a Profiler to `autoclean()`, `autoclean_cv()`, `autoclean_chunked()`, or the `fit()` and `transform()`
+    methods of a DataCleaner to find out where the cleaning time goes. Every stage adds one record, either for a
+    single column (e.g., fitting the encoder of a categorical column) or for a batch of columns that is processed
+    at once (e.g., the medians of the numerical columns). Without a Profiler, none of this bookkeeping is done.
+
+    Memory is measured with `tracemalloc`, which is only switched on while a stage runs. If it is already
+    tracing, e.g. for an enclosing stage or for the caller's own measurements, its peak is left untouched, so a
+    stage that does not raise that peak only records the memory that it still holds when it ends. When the
+    columns are cleaned with several parallel jobs, the work done by the jobs is recorded as a single stage and
+    the memory allocated by the worker processes is not counted.
+
+    Parameters
+    ----------
+    trace_memory: bool
+        Record the peak number of bytes allocated during each stage, which slows down the profiled stages
+        (default: True)
+    callback: callable
+        Called with every record as soon as its stage finishes, e.g. to send it to a metrics system (default: None)
+
+    Attributes
+    ----------
+    records: list
+        One dict per finished stage with the keys 'stage', 'columns' (the columns that the stage processed, or
+        None for the whole data set), 'rows', 'seconds', and 'memory_bytes' (None if `trace_memory` is False)
+
+    """
+
+    def __init__(self, trace_memory=True, callback=None):
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.records = []
+
+    @contextlib.contextmanager
+    def stage(self, name, columns=None, rows=None):
+        """Records the wall time and memory use of the code that runs inside the `with` block
+
+        Parameters
+        ----------
+        name: str
+            Name of the stage
+        columns: list
+            Columns that the stage processes, or None for the whole data set (default: None)
+        rows: int
+            Number of rows that the stage processes (default: None)
+
+        Returns
+        ----------
+        None
+
+        """
+        start_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        start_memory, start_peak = tracemalloc.get_traced_memory() if self.trace_memory else (0, 0)
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+            memory_bytes = None
+            if self.trace_memory:
+                end_memory, end_peak = tracemalloc.get_traced_memory()
+                # Unless the stage raised the peak, its own peak is hidden behind the earlier one
+                memory_bytes = max(0, (end_peak if end_peak > start_peak else end_memory) - start_memory)
+                if start_tracing:
+                    tracemalloc.stop()
+
+            record = {'stage': name, 'columns': None if columns is None else list(columns), 'rows': rows,
+                      'seconds': seconds, 'memory_bytes': memory_bytes}
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def to_dataframe(self):
+        """Returns the records as a DataFrame with one row per stage"""
+        return pd.DataFrame(self.records, columns=_RECORD_FIELDS)
+
+    def summary(self):
+        """Returns the total time, peak memory, and number of columns of every stage name, in order of appearance"""
+        report = self.to_dataframe()
+        report['n_columns'] = [0 if columns is None else len(columns) for columns in report['columns']]
+        return report.groupby('stage', sort=False).agg({'seconds': 'sum', 'memory_bytes': 'max',
+                                                        'n_columns': 'sum'})
+
+    def to_json(self, filename=None):
+        """Returns the records as a JSON string, or writes them to `filename` if it is given"""
+        report = json.dumps(self.records, default=str, indent=2)
+        if filename is None:
+            return report
+        with open(filename, 'w') as output_file:
+            output_file.write(report)
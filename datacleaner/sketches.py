@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2016 Randal S. Olson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+and associated documentation files (the "Software"), to deal in the Software without restriction,
+including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial
+portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import print_function
+import math
+
+import numpy as np
+import pandas as pd
+
+# The quantile sketches are sized so that their worst-case rank error stays within the requested error
+# for columns of up to _MAX_SKETCH_VALUES values
+_MAX_SKETCH_VALUES = 2 ** 32
+
+
+def _compactor_size(error):
+    """Returns the smallest compactor size whose worst-case rank error is at most `error`"""
+    size = int(math.ceil(1. / error))
+    while (math.log(max(2., _MAX_SKETCH_VALUES / float(size)), 2) + 1.) / size > error:
+        size = int(math.ceil((math.log(max(2., _MAX_SKETCH_VALUES / float(size)), 2) + 1.) / error))
+    return size
+
+
+class QuantileSketch(object):
+    """Estimates the quantiles of a numerical column in a fixed amount of memory
+
+    This is a KLL-style sketch: a stack of compactors in which every item on level h stands for 2 ** h values.
+    Whenever a level holds more than `size` items, they are sorted and every other item (starting at a random
+    offset) is promoted to the next level. Each such compaction shifts the rank of any value by at most 2 ** h,
+    which the sketch adds up in `error_bound_`, so the achieved error is known exactly rather than estimated.
+    Sketches of different parts of a column can be merged into a sketch of the whole column.
+
+    Parameters
+    ----------
+    error: float
+        Largest rank error, as a fraction of the number of values, that the sketch may have (default: 0.01)
+    seed: int
+        Seed of the random offsets, so that equal inputs give equal sketches (default: 0)
+
+    Attributes
+    ----------
+    size: int
+        Number of items that every level holds before it is compacted
+    n_values: int
+        Number of values that the sketch summarizes, not counting NaNs
+    error_bound_: int
+        Largest number of positions by which the rank of any value in the sketch can be off
+
+    """
+
+    def __init__(self, error=0.01, seed=0):
+        self.error = error
+        self.size = _compactor_size(error)
+        self.n_values = 0
+        self.error_bound_ = 0
+        self._levels = [np.empty(0)]
+        self._random_state = np.random.RandomState(seed)
+
+    @property
+    def achieved_error(self):
+        """Largest rank error of the sketch as a fraction of the number of values"""
+        return self.error_bound_ / float(max(self.n_values, 1))
+
+    def update(self, values):
+        """Adds the non-NaN values of an array to the sketch and returns the sketch"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n_values += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compact()
+        return self
+
+    def merge(self, other):
+        """Adds all values summarized by another QuantileSketch to this sketch and returns this sketch"""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, other_items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], other_items])
+        self.n_values += other.n_values
+        self.error_bound_ += other.error_bound_
+        self._compact()
+        return self
+
+    def _compact(self):
+        """Compacts every level that holds more than `size` items, from the bottom level up"""
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self.size:
+                items = np.sort(items)
+                n_paired = len(items) - len(items) % 2
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                promoted_items = items[self._random_state.randint(2):n_paired:2]
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted_items])
+                self._levels[level] = items[n_paired:]
+                self.error_bound_ += 2 ** level
+            level += 1
+
+    def _weighted_items(self):
+        """Returns the items of all levels in sorted order and their cumulative weights"""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.int64)
+                                  for level, level_items in enumerate(self._levels)])
+        order = np.argsort(items, kind='mergesort')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Returns the value at quantile `q` (between 0 and 1), or NaN if the sketch is empty"""
+        if self.n_values == 0:
+            return np.nan
+        items, cumulative_weights = self._weighted_items()
+        rank = min(int(q * cumulative_weights[-1]), cumulative_weights[-1] - 1)
+        return items[np.searchsorted(cumulative_weights, rank, side='right')]
+
+    def median(self):
+        """Returns the median, which is exact as long as the sketch has not been compacted, or NaN if it is empty"""
+        if self.n_values == 0:
+            return np.nan
+        items, cumulative_weights = self._weighted_items()
+        total_weight = cumulative_weights[-1]
+        lower_value = items[np.searchsorted(cumulative_weights, (total_weight - 1) // 2, side='right')]
+        upper_value = items[np.searchsorted(cumulative_weights, total_weight // 2, side='right')]
+        return (lower_value + upper_value) / 2.
+
+
+class FrequencySketch(object):
+    """Estimates the most frequent value of a column with a fixed number of counters
+
+    This is the Misra-Gries heavy hitters summary. It keeps at most `1 / error` counters; whenever a batch of
+    values leaves more counters than that, the counts are all lowered until enough of them drop to zero. The
+    total amount by which the counts were lowered, `error_bound_`, bounds how much any count is underestimated,
+    so the estimated mode occurs at most `error_bound_` times less often than the true mode. Sketches of
+    different parts of a column can be merged into a sketch of the whole column.
+
+    Parameters
+    ----------
+    error: float
+        Largest frequency error, as a fraction of the number of values, that the sketch may have (default: 0.01)
+
+    Attributes
+    ----------
+    size: int
+        Largest number of counters that the sketch keeps
+    n_values: int
+        Number of values that the sketch summarizes, not counting NaNs
+    counts_: pandas.Series
+        Estimated count of every value that still has a counter
+    error_bound_: int
+        Largest number of times that the count of any value can be underestimated
+
+    """
+
+    def __init__(self, error=0.01):
+        self.error = error
+        self.size = int(math.ceil(1. / error))
+        self.n_values = 0
+        self.error_bound_ = 0
+        self.counts_ = pd.Series(dtype=np.int64)
+
+    @property
+    def achieved_error(self):
+        """Largest frequency error of the sketch as a fraction of the number of values"""
+        return self.error_bound_ / float(max(self.n_values, 1))
+
+    def update(self, values):
+        """Adds the non-NaN values of an array to the sketch and returns the sketch"""
+        value_counts = pd.Series(values).value_counts(dropna=True, sort=False)
+        # The unused categories of a Categorical are counted as 0 and must not become the mode
+        value_counts = value_counts[value_counts > 0]
+        self.n_values += int(value_counts.sum())
+        self._add_counts(value_counts)
+        return self
+
+    def merge(self, other):
+        """Adds all values summarized by another FrequencySketch to this sketch and returns this sketch"""
+        self.n_values += other.n_values
+        self.error_bound_ += other.error_bound_
+        self._add_counts(other.counts_)
+        return self
+
+    def _add_counts(self, value_counts):
+        """Adds value counts to the counters and lowers them until at most `size` counters are left"""
+        counts = self.counts_.add(value_counts, fill_value=0).astype(np.int64)
+        if len(counts) > self.size:
+            decrement = np.partition(counts.values, len(counts) - self.size - 1)[len(counts) - self.size - 1]
+            counts = counts[counts > decrement] - decrement
+            self.error_bound_ += int(decrement)
+        self.counts_ = counts
+
+    def most_frequent(self):
+        """Returns the value with the highest estimated count (the smallest one on ties), or None if it is empty"""
+        if self.n_values == 0 or len(self.counts_) == 0:
+            return None
+        most_frequent = self.counts_[self.counts_ == self.counts_.max()]
+        return most_frequent.index.sort_values()[0]
@@ -33,17 +33,20 @@ or Twitter: https://twitter.com/randal_olson
 This project is hosted at https://github.com/rhiever/datacleaner
 ''',
     zip_safe=True,
-    install_requires=['pandas', 'scikit-learn', 'update_checker'],
+    python_requires='>=3.8',
+    install_requires=['numpy', 'pandas>=2.0', 'scikit-learn', 'joblib>=1.4', 'update_checker'],
     classifiers=[
         'Intended Audience :: Developers',
         'Intended Audience :: Information Technology',
         'Intended Audience :: Science/Research',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Utilities'
     ],
     keywords=['data cleaning', 'csv', 'machine learning', 'data analysis', 'data engineering'],
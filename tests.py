@@ -1,7 +1,25 @@
-from datacleaner import autoclean, autoclean_cv
+from datacleaner import (autoclean, autoclean_batch, autoclean_cv, autoclean_chunked, autoclean_dask,
+                         autoclean_partitioned, autoclean_splits, downcast_dataframe, CountEncoder, DataCleaner,
+                         FactorizeEncoder, FrequencyEncoder, IncrementalDataCleaner, Profiler, SparseOneHotEncoder,
+                         main, write_npy)
+from datacleaner.cache import FitCache
+from datacleaner.sketches import FrequencySketch, QuantileSketch
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
+import contextlib
+import datacleaner.cleaner
+import datacleaner.encoders
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from unittest import SkipTest
 
 np.random.seed(300)
 
@@ -41,8 +59,8 @@ def test_autoclean_with_nans_all_numerical():
     data.loc[50:70, 'C'] = np.nan
 
     hand_cleaned_data = data.copy()
-    hand_cleaned_data['A'].fillna(hand_cleaned_data['A'].median(), inplace=True)
-    hand_cleaned_data['C'].fillna(hand_cleaned_data['C'].median(), inplace=True)
+    hand_cleaned_data['A'] = hand_cleaned_data['A'].fillna(hand_cleaned_data['A'].median())
+    hand_cleaned_data['C'] = hand_cleaned_data['C'].fillna(hand_cleaned_data['C'].median())
 
     cleaned_data = autoclean(data)
 
@@ -69,11 +87,11 @@ def test_autoclean_cv_with_nans_all_numerical():
     training_A_median = hand_cleaned_training_data['A'].median()
     training_C_median = hand_cleaned_training_data['C'].median()
 
-    hand_cleaned_training_data['A'].fillna(training_A_median, inplace=True)
-    hand_cleaned_training_data['C'].fillna(training_C_median, inplace=True)
+    hand_cleaned_training_data['A'] = hand_cleaned_training_data['A'].fillna(training_A_median)
+    hand_cleaned_training_data['C'] = hand_cleaned_training_data['C'].fillna(training_C_median)
 
-    hand_cleaned_testing_data['A'].fillna(training_A_median, inplace=True)
-    hand_cleaned_testing_data['C'].fillna(training_C_median, inplace=True)
+    hand_cleaned_testing_data['A'] = hand_cleaned_testing_data['A'].fillna(training_A_median)
+    hand_cleaned_testing_data['C'] = hand_cleaned_testing_data['C'].fillna(training_C_median)
 
     cleaned_training_data, cleaned_testing_data = autoclean_cv(training_data, testing_data)
 
@@ -133,8 +151,8 @@ def test_autoclean_with_nans_with_strings():
     data.loc[50:70, 'C'] = np.nan
 
     hand_cleaned_data = data.copy()
-    hand_cleaned_data['A'].fillna(hand_cleaned_data['A'].median(), inplace=True)
-    hand_cleaned_data['C'].fillna(hand_cleaned_data['C'].mode()[0], inplace=True)
+    hand_cleaned_data['A'] = hand_cleaned_data['A'].fillna(hand_cleaned_data['A'].median())
+    hand_cleaned_data['C'] = hand_cleaned_data['C'].fillna(hand_cleaned_data['C'].mode()[0])
     hand_cleaned_data['C'] = LabelEncoder().fit_transform(hand_cleaned_data['C'].values)
 
     cleaned_data = autoclean(data)
@@ -164,11 +182,11 @@ def test_autoclean_cv_with_nans_with_strings():
 
     training_A_median = hand_cleaned_training_data['A'].median()
     training_C_mode = hand_cleaned_training_data['C'].mode()[0]
-    hand_cleaned_training_data['A'].fillna(training_A_median, inplace=True)
-    hand_cleaned_training_data['C'].fillna(training_C_mode, inplace=True)
+    hand_cleaned_training_data['A'] = hand_cleaned_training_data['A'].fillna(training_A_median)
+    hand_cleaned_training_data['C'] = hand_cleaned_training_data['C'].fillna(training_C_mode)
 
-    hand_cleaned_testing_data['A'].fillna(training_A_median, inplace=True)
-    hand_cleaned_testing_data['C'].fillna(training_C_mode, inplace=True)
+    hand_cleaned_testing_data['A'] = hand_cleaned_testing_data['A'].fillna(training_A_median)
+    hand_cleaned_testing_data['C'] = hand_cleaned_testing_data['C'].fillna(training_C_mode)
 
     encoder = LabelEncoder()
     hand_cleaned_training_data['C'] = encoder.fit_transform(hand_cleaned_training_data['C'].values)
@@ -187,8 +205,8 @@ def test_autoclean_real_data():
 
     hand_cleaned_adult_data = adult_data.copy()
 
-    hand_cleaned_adult_data['age'].fillna(hand_cleaned_adult_data['age'].median(), inplace=True)
-    hand_cleaned_adult_data['education'].fillna(hand_cleaned_adult_data['education'].mode()[0], inplace=True)
+    hand_cleaned_adult_data['age'] = hand_cleaned_adult_data['age'].fillna(hand_cleaned_adult_data['age'].median())
+    hand_cleaned_adult_data['education'] = hand_cleaned_adult_data['education'].fillna(hand_cleaned_adult_data['education'].mode()[0])
 
     for column in ['workclass', 'education', 'marital-status',
                    'occupation', 'relationship', 'race',
@@ -218,11 +236,11 @@ def test_autoclean_cv_real_data():
     training_age_median = hand_cleaned_training_adult_data['age'].median()
     training_education_mode = hand_cleaned_training_adult_data['education'].mode()[0]
 
-    hand_cleaned_training_adult_data['age'].fillna(training_age_median, inplace=True)
-    hand_cleaned_training_adult_data['education'].fillna(training_education_mode, inplace=True)
+    hand_cleaned_training_adult_data['age'] = hand_cleaned_training_adult_data['age'].fillna(training_age_median)
+    hand_cleaned_training_adult_data['education'] = hand_cleaned_training_adult_data['education'].fillna(training_education_mode)
 
-    hand_cleaned_testing_adult_data['age'].fillna(training_age_median, inplace=True)
-    hand_cleaned_testing_adult_data['education'].fillna(training_education_mode, inplace=True)
+    hand_cleaned_testing_adult_data['age'] = hand_cleaned_testing_adult_data['age'].fillna(training_age_median)
+    hand_cleaned_testing_adult_data['education'] = hand_cleaned_testing_adult_data['education'].fillna(training_education_mode)
 
     for column in ['workclass', 'education', 'marital-status',
                    'occupation', 'relationship', 'race',
@@ -235,3 +253,924 @@ def test_autoclean_cv_real_data():
 
     assert cleaned_adult_training_data.equals(hand_cleaned_training_adult_data)
     assert cleaned_adult_testing_data.equals(hand_cleaned_testing_adult_data)
+
+def test_autoclean_chunked_real_data():
+    """Test autoclean_chunked() with the adult data set"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        input_filename = os.path.join(temp_dir, 'adult_nans.csv')
+        output_filename = os.path.join(temp_dir, 'adult_clean.csv')
+        adult_data.to_csv(input_filename, sep='\t', index=False)
+
+        hand_cleaned_adult_data = autoclean(pd.read_csv(input_filename, sep='\t'))
+        autoclean_chunked(input_filename, output_filename, chunksize=1000)
+        chunk_cleaned_adult_data = pd.read_csv(output_filename, sep='\t')
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert chunk_cleaned_adult_data.equals(hand_cleaned_adult_data)
+
+def test_autoclean_chunked_mixed_chunk_types():
+    """Test autoclean_chunked() with columns whose inferred type differs between chunks"""
+    data = pd.DataFrame({'A': np.random.randint(0, 10, 1000).astype(float),
+                         'B': np.random.randint(0, 3, 1000).astype(str)})
+    data.loc[700:750, 'A'] = np.nan
+    data.loc[600:650, 'B'] = np.nan
+    data.loc[900:, 'B'] = 'oranges'
+    # Chunks of only True and False are read as booleans, the last chunk as strings
+    data['C'] = np.random.choice(['True', 'False'], 1000)
+    data.loc[950:, 'C'] = 'maybe'
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        input_filename = os.path.join(temp_dir, 'mixed.csv')
+        output_filename = os.path.join(temp_dir, 'mixed_clean.csv')
+        data.to_csv(input_filename, sep=',', index=False)
+
+        hand_cleaned_data = autoclean(pd.read_csv(input_filename, sep=','))
+        autoclean_chunked(input_filename, output_filename, chunksize=300,
+                          input_separator=',', output_separator=',')
+        chunk_cleaned_data = pd.read_csv(output_filename, sep=',')
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert chunk_cleaned_data.equals(hand_cleaned_data)
+
+def test_datacleaner_matches_autoclean_cv():
+    """Test that a fitted DataCleaner cleans data sets the same way as autoclean_cv()"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+
+    training_adult_data = adult_data[:int(len(adult_data) / 2.)].copy()
+    testing_adult_data = adult_data[int(len(adult_data) / 2.):].copy()
+
+    training_adult_data.loc[30:60, 'age'] = np.nan
+    training_adult_data.loc[90:100, 'education'] = np.nan
+    testing_adult_data.loc[20:40, 'education'] = np.nan
+
+    cleaned_training_data, cleaned_testing_data = autoclean_cv(training_adult_data, testing_adult_data, copy=True)
+
+    cleaner = DataCleaner(ignore_update_check=True)
+    assert cleaner.fit_transform(training_adult_data).equals(cleaned_training_data)
+    assert cleaner.transform(testing_adult_data).equals(cleaned_testing_data)
+
+    # The input data sets should not be modified by default
+    assert training_adult_data['age'].isnull().sum() == 31
+
+def test_datacleaner_save_load():
+    """Test that a saved DataCleaner cleans data sets the same way after it is loaded"""
+    data = pd.DataFrame({'A': np.random.rand(1000),
+                         'B': np.random.rand(1000),
+                         'C': np.random.randint(0, 3, 1000)})
+
+    string_map = {0: 'oranges', 1: 'apples', 2: 'bananas'}
+    data['C'] = data['C'].apply(lambda x: string_map[x])
+    data.loc[10:20, 'A'] = np.nan
+    data.loc[50:70, 'C'] = np.nan
+
+    cleaner = DataCleaner(ignore_update_check=True).fit(data[:500])
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cleaner_filename = os.path.join(temp_dir, 'cleaner.pkl')
+        cleaner.save(cleaner_filename)
+        loaded_cleaner = DataCleaner.load(cleaner_filename)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert loaded_cleaner.fill_values_ == cleaner.fill_values_
+    assert loaded_cleaner.transform(data[500:]).equals(cleaner.transform(data[500:]))
+
+def test_datacleaner_in_pipeline():
+    """Test that a DataCleaner can be used inside a scikit-learn Pipeline"""
+    data = pd.DataFrame({'A': np.random.rand(1000),
+                         'B': np.random.rand(1000),
+                         'C': np.random.randint(0, 3, 1000)})
+
+    string_map = {0: 'oranges', 1: 'apples', 2: 'bananas'}
+    data['C'] = data['C'].apply(lambda x: string_map[x])
+    data.loc[10:20, 'A'] = np.nan
+
+    pipeline = make_pipeline(DataCleaner(ignore_update_check=True), StandardScaler())
+    transformed_data = pipeline.fit(data[:500]).transform(data[500:])
+
+    assert transformed_data.shape == (500, 3)
+    assert not np.isnan(transformed_data).any()
+
+def test_autoclean_wide_mixed_dtypes():
+    """Test autoclean() with a wide data set that has NaNs in columns of several dtypes"""
+    data = pd.DataFrame(np.random.rand(200, 300), columns=['column{}'.format(i) for i in range(300)])
+    data.iloc[np.random.rand(200, 300) < 0.1] = np.nan
+    data['float32'] = np.random.rand(200).astype(np.float32)
+    data.loc[10:20, 'float32'] = np.nan
+    data['int'] = np.random.randint(0, 3, 200)
+    data['string'] = np.random.choice(['oranges', 'apples', 'bananas'], 200).astype(object)
+    data.loc[50:70, 'string'] = np.nan
+
+    hand_cleaned_data = data.copy()
+    for column in hand_cleaned_data.columns.values:
+        try:
+            hand_cleaned_data[column] = hand_cleaned_data[column].fillna(hand_cleaned_data[column].median())
+        except TypeError:
+            hand_cleaned_data[column] = hand_cleaned_data[column].fillna(hand_cleaned_data[column].mode()[0])
+    hand_cleaned_data['string'] = LabelEncoder().fit_transform(hand_cleaned_data['string'].values)
+
+    cleaned_data = autoclean(data)
+
+    assert cleaned_data.equals(hand_cleaned_data)
+    assert cleaned_data['float32'].dtype == np.float32
+
+def test_autoclean_n_jobs():
+    """Test that autoclean() and autoclean_cv() clean data sets the same way in parallel as serially"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+
+    assert autoclean(adult_data, copy=True, n_jobs=2).equals(autoclean(adult_data, copy=True))
+
+    training_adult_data = adult_data[:int(len(adult_data) / 2.)]
+    testing_adult_data = adult_data[int(len(adult_data) / 2.):]
+
+    cleaned_training_data, cleaned_testing_data = autoclean_cv(training_adult_data, testing_adult_data,
+                                                               copy=True)
+    parallel_training_data, parallel_testing_data = autoclean_cv(training_adult_data, testing_adult_data,
+                                                                 copy=True, n_jobs=2)
+
+    assert parallel_training_data.equals(cleaned_training_data)
+    assert parallel_testing_data.equals(cleaned_testing_data)
+
+def test_autoclean_factorize_encoder():
+    """Test autoclean() with the FactorizeEncoder"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[90:100, 'education'] = np.nan
+
+    label_cleaned_data = autoclean(adult_data, copy=True)
+    sorted_cleaned_data = autoclean(adult_data, copy=True, encoder=FactorizeEncoder,
+                                    encoder_kwargs={'sort': True, 'as_category': False})
+    category_cleaned_data = autoclean(adult_data, copy=True, encoder=FactorizeEncoder)
+
+    for column in ['workclass', 'education', 'marital-status',
+                   'occupation', 'relationship', 'race',
+                   'sex', 'native-country', 'label']:
+        # Sorted categories should give the same codes as LabelEncoder, in the smallest integer dtype
+        assert np.array_equal(sorted_cleaned_data[column].values, label_cleaned_data[column].values)
+        assert sorted_cleaned_data[column].dtype == np.int8
+
+        assert str(category_cleaned_data[column].dtype) == 'category'
+        assert category_cleaned_data[column].cat.codes.dtype == np.int8
+
+def test_factorize_encoder_transform():
+    """Test that the FactorizeEncoder encodes new data with the categories it was fit on"""
+    encoder = FactorizeEncoder(as_category=False).fit(np.array(['oranges', 'apples', 'oranges'], dtype=object))
+
+    assert list(encoder.classes_) == ['oranges', 'apples']
+    assert list(encoder.transform(np.array(['apples', 'bananas', 'oranges'], dtype=object))) == [1, -1, 0]
+
+def test_autoclean_cv_handle_unknown():
+    """Test autoclean_cv() with categories in the testing data set that are not in the training data set"""
+    training_data = pd.DataFrame({'A': np.random.rand(6),
+                                  'C': ['oranges', 'apples', 'apples', 'bananas', 'apples', np.nan]})
+    testing_data = pd.DataFrame({'A': np.random.rand(4),
+                                 'C': ['bananas', 'kiwis', np.nan, 'oranges']})
+
+    try:
+        autoclean_cv(training_data, testing_data, copy=True)
+        assert False
+    except ValueError:
+        pass
+
+    cleaned_training_data, cleaned_testing_data = autoclean_cv(training_data, testing_data, copy=True,
+                                                               handle_unknown='unknown')
+    assert list(cleaned_training_data['C']) == [2, 0, 0, 1, 0, 0]
+    assert list(cleaned_testing_data['C']) == [1, -1, 0, 2]
+
+    cleaned_training_data, cleaned_testing_data = autoclean_cv(training_data, testing_data, copy=True,
+                                                               handle_unknown='mode')
+    assert list(cleaned_training_data['C']) == [2, 0, 0, 1, 0, 0]
+    assert list(cleaned_testing_data['C']) == [1, 0, 0, 2]
+
+    cleaned_training_data, cleaned_testing_data = autoclean_cv(training_data, testing_data, copy=True,
+                                                               encoder=FactorizeEncoder, handle_unknown='mode')
+    assert list(cleaned_testing_data['C']) == [2, 1, 1, 0]
+    assert str(cleaned_testing_data['C'].dtype) == 'category'
+
+def test_autoclean_downcast():
+    """Test autoclean() with downcasting to the smallest dtypes"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+
+    cleaned_data = autoclean(adult_data, copy=True)
+    downcast_data = autoclean(adult_data, copy=True, downcast=True)
+
+    # Downcasting should not change any values
+    assert np.array_equal(downcast_data.values, cleaned_data.values)
+    assert downcast_data['age'].dtype == np.float32
+    assert downcast_data['sex'].dtype == np.uint8
+    assert downcast_data['fnlwgt'].dtype == np.float32
+    assert downcast_data.memory_usage().sum() < cleaned_data.memory_usage().sum()
+    assert downcast_data.attrs['bytes_saved'] == (cleaned_data.memory_usage(index=False, deep=True).sum() -
+                                                  downcast_data.memory_usage(index=False, deep=True).sum())
+
+    category_data = autoclean(adult_data, copy=True, downcast=True, max_categories=20)
+    assert str(category_data['education-num'].dtype) == 'category'
+    assert category_data.attrs['bytes_saved'] > downcast_data.attrs['bytes_saved']
+
+def test_downcast_dataframe_categories():
+    """Test downcast_dataframe() with low-cardinality columns"""
+    data = pd.DataFrame({'A': np.random.rand(1000),
+                         'B': np.random.randint(0, 3, 1000) / 3.,
+                         'C': np.random.randint(-1, 300, 1000)})
+    original_data = data.copy()
+
+    bytes_saved = downcast_dataframe(data, max_categories=10)
+
+    assert data['A'].dtype == np.float64
+    assert str(data['B'].dtype) == 'category'
+    assert data['C'].dtype == np.int16
+    assert bytes_saved == original_data.memory_usage(deep=True).sum() - data.memory_usage(deep=True).sum()
+    assert np.array_equal(data['B'].astype(np.float64).values, original_data['B'].values)
+
+def test_autoclean_memory_usage():
+    """Test that autoclean() cleans in place without copying the data set unless asked to"""
+    import tracemalloc
+    import datacleaner.datacleaner
+
+    def make_data():
+        values = np.random.rand(100000, 40)
+        values[np.random.rand(100000, 40) < 0.05] = np.nan
+        data = pd.DataFrame(values, columns=['column{}'.format(i) for i in range(40)])
+        data['C'] = pd.Series(np.random.choice(['oranges', 'apples', 'bananas'], 100000), dtype=object)
+        data.loc[50:70, 'C'] = np.nan
+        return data
+
+    original_batch_bytes = datacleaner.datacleaner._BATCH_BYTES
+    datacleaner.datacleaner._BATCH_BYTES = 2 ** 20
+    try:
+        for copy, max_peak_ratio in [(False, 0.5), (True, 1.5)]:
+            data = make_data()
+            data_bytes = data.memory_usage(index=False).sum()
+
+            tracemalloc.start()
+            cleaned_data = autoclean(data, copy=copy)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert peak_bytes < max_peak_ratio * data_bytes
+            assert (cleaned_data is data) == (not copy)
+            assert not cleaned_data.isnull().values.any()
+    finally:
+        datacleaner.datacleaner._BATCH_BYTES = original_batch_bytes
+
+def test_main_columnar_formats():
+    """Test the command line with Parquet and Feather input and output files"""
+    if importlib.util.find_spec('pyarrow') is None:
+        raise SkipTest('pyarrow is not installed')
+
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+    columns = ['age', 'education', 'sex']
+
+    temp_dir = tempfile.mkdtemp()
+    original_argv = sys.argv
+    try:
+        input_filename = os.path.join(temp_dir, 'adult.parquet')
+        output_filename = os.path.join(temp_dir, 'adult_clean.feather')
+        adult_data.to_parquet(input_filename, index=False)
+
+        sys.argv = ['datacleaner', input_filename, '-o', output_filename,
+                    '--columns', ','.join(columns), '--ignore-update-check']
+        main()
+        cleaned_adult_data = pd.read_feather(output_filename)
+    finally:
+        sys.argv = original_argv
+        shutil.rmtree(temp_dir)
+
+    assert cleaned_adult_data.equals(autoclean(adult_data[columns].copy()))
+
+def test_import_is_lazy():
+    """Test that importing datacleaner does not import scikit-learn or the update checker"""
+    code = ('import sys, datacleaner; '
+            'assert "sklearn" not in sys.modules and "update_checker" not in sys.modules; '
+            'datacleaner.DataCleaner; assert "sklearn" in sys.modules')
+    subprocess.check_call([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)))
+
+def test_profiler():
+    """Test that the Profiler records every cleaning stage without changing the cleaned data set"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+
+    recorded = []
+    profiler = Profiler(callback=recorded.append)
+    profiled_adult_data = autoclean(adult_data.copy(), profiler=profiler)
+
+    assert profiled_adult_data.equals(autoclean(adult_data.copy()))
+    assert recorded == profiler.records
+    report = profiler.to_dataframe()
+    assert set(['find_nans', 'median', 'mode', 'encoder_fit', 'fill_nans']) <= set(report['stage'])
+    assert (report['seconds'] >= 0).all() and (report['memory_bytes'] >= 0).all()
+    assert ['education'] in list(report.loc[report['stage'] == 'mode', 'columns'])
+    assert profiler.summary().loc['encoder_fit', 'n_columns'] == len(adult_data.select_dtypes('object').columns)
+
+    # A tracemalloc session that the caller already runs keeps its peak
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        large_block = np.ones(2 ** 20)
+        del large_block
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        with Profiler().stage('small'):
+            small_block = np.ones(2 ** 10)
+        assert tracemalloc.get_traced_memory()[1] >= peak_bytes
+    finally:
+        tracemalloc.stop()
+    del small_block
+
+def test_main_profile():
+    """Test that the command line writes a JSON report of the cleaning stages with --profile"""
+    temp_dir = tempfile.mkdtemp()
+    original_argv = sys.argv
+    try:
+        output_filename = os.path.join(temp_dir, 'adult_clean.csv')
+        profile_filename = os.path.join(temp_dir, 'profile.json')
+        sys.argv = ['datacleaner', 'adult.csv.gz', '-o', output_filename, '--profile', profile_filename,
+                    '--ignore-update-check']
+        main()
+        with open(profile_filename) as profile_file:
+            records = json.load(profile_file)
+    finally:
+        sys.argv = original_argv
+        shutil.rmtree(temp_dir)
+
+    stages = [record['stage'] for record in records]
+    assert stages[0] == 'read' and stages[-1] == 'write'
+    assert 'encoder_fit' in stages
+
+def test_sketches():
+    """Test that merged sketches of the parts of a column stay within their reported error bounds"""
+    random_state = np.random.RandomState(300)
+    values = random_state.lognormal(size=200000)
+    categories = random_state.zipf(1.5, 200000).astype(str)
+
+    quantile_sketch = QuantileSketch(error=0.01).update(values[:120000]).merge(
+        QuantileSketch(error=0.01).update(values[120000:]))
+    assert quantile_sketch.n_values == len(values)
+    assert 0 < quantile_sketch.achieved_error <= 0.01
+    assert abs((values < quantile_sketch.median()).mean() - 0.5) <= quantile_sketch.achieved_error
+    assert QuantileSketch().update([3., np.nan, 1., 2., 10.]).median() == 2.5
+
+    frequency_sketch = FrequencySketch(error=0.01).update(categories[:120000]).merge(
+        FrequencySketch(error=0.01).update(categories[120000:]))
+    assert len(frequency_sketch.counts_) <= frequency_sketch.size
+    assert frequency_sketch.achieved_error <= 0.01
+    assert frequency_sketch.most_frequent() == pd.Series(categories).mode()[0]
+
+def test_autoclean_approximate():
+    """Test that the approximate fill values are reported and stay close to the exact ones"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[5:500:3, 'fnlwgt'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+
+    approximate_adult_data = autoclean(adult_data.copy(), approximate_error=0.01)
+    exact_adult_data = autoclean(adult_data.copy())
+
+    fill_errors = approximate_adult_data.attrs['fill_errors']
+    assert sorted(fill_errors) == ['age', 'education', 'fnlwgt']
+    assert max(fill_errors.values()) <= 0.01
+    assert approximate_adult_data.drop('fnlwgt', axis=1).equals(exact_adult_data.drop('fnlwgt', axis=1))
+    fnlwgt_fill_value = approximate_adult_data.loc[5, 'fnlwgt']
+    assert abs((adult_data['fnlwgt'].dropna() < fnlwgt_fill_value).mean() - 0.5) <= fill_errors['fnlwgt']
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        input_filename = os.path.join(temp_dir, 'adult.tsv')
+        output_filename = os.path.join(temp_dir, 'adult_clean.tsv')
+        adult_data.to_csv(input_filename, sep='\t', index=False)
+        chunked_fill_errors = autoclean_chunked(input_filename, output_filename, chunksize=5000,
+                                                approximate_error=0.01)
+        chunked_adult_data = pd.read_csv(output_filename, sep='\t')
+
+        # Only the medians are estimated in chunks, and the command line says so
+        original_argv = sys.argv
+        printed_output = io.StringIO()
+        try:
+            sys.argv = ['datacleaner', input_filename, '-o', output_filename, '--chunksize', '5000',
+                        '--approximate-error', '0.01', '--ignore-update-check']
+            with contextlib.redirect_stdout(printed_output):
+                main()
+        finally:
+            sys.argv = original_argv
+        assert 'Approximate medians are off by at most' in printed_output.getvalue()
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert 0 < max(chunked_fill_errors.values()) <= 0.01
+    assert chunked_adult_data.drop('fnlwgt', axis=1).equals(exact_adult_data.drop('fnlwgt', axis=1))
+
+    # Datetime columns and object columns of numbers get their median, as in exact mode
+    mixed_data = pd.DataFrame({'A': pd.to_datetime(['2020-01-01', None, '2020-01-03', '2020-01-07', '2020-01-07']),
+                               'B': pd.Series([1, 2, None, 4, 4], dtype=object)})
+    approximate_mixed_data = autoclean(mixed_data.copy(), approximate_error=0.01)
+    assert approximate_mixed_data.equals(autoclean(mixed_data.copy()))
+    assert approximate_mixed_data.loc[1, 'A'] == pd.Timestamp('2020-01-05')
+
+    # An all-NaN categorical column has no mode in either path, even though it has categories
+    empty_data = pd.DataFrame({'A': pd.Categorical([None, None, None], categories=['x', 'y']),
+                               'B': [1., 2., np.nan]})
+    approximate_empty_data = autoclean(empty_data.copy(), approximate_error=0.01)
+    assert approximate_empty_data.equals(autoclean(empty_data.copy()))
+    assert approximate_empty_data['A'].isnull().all()
+    assert FrequencySketch(0.01).update(empty_data['A'].values).most_frequent() is None
+
+def test_autoclean_partitioned():
+    """Test that cleaning a directory of Parquet partitions gives the same result as autoclean on all of them"""
+    if importlib.util.find_spec('pyarrow') is None:
+        raise SkipTest('pyarrow is not installed')
+
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+    adult_data.loc[20000:20100, 'fnlwgt'] = np.nan
+    adult_data['interview-date'] = pd.Timestamp('2016-01-01') + pd.to_timedelta(adult_data['fnlwgt'] % 997, unit='D')
+    adult_data.loc[100:200, 'interview-date'] = pd.NaT
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        input_directory = os.path.join(temp_dir, 'adult')
+        output_directory = os.path.join(temp_dir, 'adult_clean')
+        os.makedirs(os.path.join(input_directory, 'year=2016'))
+        partition_filenames = ['part.0.parquet', 'part.1.parquet', os.path.join('year=2016', 'part.2.parquet')]
+        for partition_filename, rows in zip(partition_filenames, np.array_split(np.arange(len(adult_data)), 3)):
+            adult_data.iloc[rows].to_parquet(os.path.join(input_directory, partition_filename), index=False)
+
+        autoclean_partitioned(input_directory, output_directory, n_jobs=2)
+        cleaned_adult_data = pd.concat([pd.read_parquet(os.path.join(output_directory, partition_filename))
+                                        for partition_filename in partition_filenames], ignore_index=True)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert cleaned_adult_data.equals(autoclean(adult_data.copy()))
+
+def test_autoclean_dask():
+    """Test that cleaning a Dask DataFrame gives the same result as autoclean on the computed DataFrame"""
+    try:
+        import dask
+        import dask.dataframe as dd
+    except ImportError:
+        raise SkipTest('dask is not installed')
+
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+    adult_data.loc[20000:20100, 'fnlwgt'] = np.nan
+
+    with dask.config.set({'scheduler': 'synchronous'}):
+        cleaned_adult_data, fill_errors = autoclean_dask(dd.from_pandas(adult_data, npartitions=5))
+        computed_adult_data = cleaned_adult_data.compute()
+
+    assert fill_errors == {}
+    assert (cleaned_adult_data.dtypes == computed_adult_data.dtypes).all()
+    assert computed_adult_data.equals(autoclean(adult_data.copy()))
+
+def test_datacleaner_cache():
+    """Test that fitting on the same training data set with the same options loads the cached parameters"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+    training_data = adult_data[:20000]
+    testing_data = adult_data[20000:]
+
+    cache_dir = tempfile.mkdtemp()
+    original_fit_columns = datacleaner.cleaner._fit_columns
+    try:
+        expected_testing_data = DataCleaner(cache_dir=cache_dir, handle_unknown='mode').fit(
+            training_data).transform(testing_data)
+        assert len(os.listdir(cache_dir)) == 1
+
+        # Different options are a cache miss
+        DataCleaner(cache_dir=cache_dir, handle_unknown='unknown').fit(training_data)
+        assert len(os.listdir(cache_dir)) == 2
+
+        def fail(*args, **kwargs):
+            raise AssertionError('The cached parameters were not used')
+        datacleaner.cleaner._fit_columns = fail
+        cached_testing_data = DataCleaner(cache_dir=cache_dir, handle_unknown='mode').fit(
+            training_data.copy()).transform(testing_data)
+    finally:
+        datacleaner.cleaner._fit_columns = original_fit_columns
+        shutil.rmtree(cache_dir)
+
+    assert cached_testing_data.equals(expected_testing_data)
+
+def test_fit_cache_eviction():
+    """Test that the fit cache removes the least recently used entries when it grows beyond its size limit"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        fit_cache = FitCache(cache_dir, max_bytes=700)
+        entry = {'values': list(range(100))}  # 228 bytes when pickled, so the cache holds three entries
+        for key, modification_time in [('a', 1), ('b', 2), ('c', 3)]:
+            fit_cache.save(key, entry)
+            os.utime(os.path.join(cache_dir, key + '.pkl'), (modification_time, modification_time))
+
+        # Loading an entry makes it the most recently used one
+        assert fit_cache.load('a') == entry
+        for key in ['d', 'e']:
+            fit_cache.save(key, entry)
+
+        assert sorted(os.listdir(cache_dir)) == ['a.pkl', 'd.pkl', 'e.pkl']
+        assert fit_cache.load('b') is None
+    finally:
+        shutil.rmtree(cache_dir)
+
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    options = {'handle_unknown': 'error'}
+    assert fit_cache.key(adult_data, options) == fit_cache.key(adult_data.copy(), options)
+    assert fit_cache.key(adult_data, options) != fit_cache.key(adult_data.iloc[::-1], options)
+    assert fit_cache.key(adult_data, options) != fit_cache.key(adult_data, {'handle_unknown': 'mode'})
+
+def test_incremental_datacleaner():
+    """Test that updating an IncrementalDataCleaner batch by batch learns the statistics of all batches
+    and keeps the codes of earlier categories stable"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+    exact_fill_values = DataCleaner(ignore_update_check=True).fit(adult_data).fill_values_
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cleaner_filename = os.path.join(temp_dir, 'cleaner.pkl')
+        IncrementalDataCleaner(ignore_update_check=True).partial_fit(adult_data[:10000]).save(cleaner_filename)
+        first_batch_codes = IncrementalDataCleaner.load(cleaner_filename).transform(adult_data[:10000])
+        first_batch_categories = IncrementalDataCleaner.load(cleaner_filename).categories_['native-country']
+
+        incremental_cleaner = IncrementalDataCleaner.load(cleaner_filename)
+        for start in range(10000, len(adult_data), 10000):
+            incremental_cleaner.partial_fit(adult_data[start:start + 10000])
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert incremental_cleaner.n_samples_seen_ == len(adult_data)
+    fill_values = incremental_cleaner.fill_values_.copy()
+
+    # A batch with a column of the wrong type is rejected before any statistics are updated
+    bad_batch = adult_data[:100].copy()
+    bad_batch['hours-per-week'] = 'full time'
+    try:
+        incremental_cleaner.partial_fit(bad_batch)
+        assert False
+    except ValueError:
+        pass
+    assert incremental_cleaner.n_samples_seen_ == len(adult_data)
+    assert incremental_cleaner.quantile_sketches_['age'].n_values == adult_data['age'].notnull().sum()
+    assert incremental_cleaner.fill_values_ == fill_values
+
+    for column, fill_value in incremental_cleaner.fill_values_.items():
+        if column == 'fnlwgt':
+            # Too many distinct values for the median to be exact
+            rank_error = abs((adult_data[column] < fill_value).mean() - 0.5)
+            assert rank_error <= incremental_cleaner.quantile_sketches_[column].achieved_error
+        else:
+            assert fill_value == exact_fill_values[column]
+
+    categories = incremental_cleaner.categories_['native-country']
+    assert len(categories) > len(first_batch_categories)
+    assert list(categories[:len(first_batch_categories)]) == list(first_batch_categories)
+    updated_codes = incremental_cleaner.transform(adult_data[:10000])
+    assert updated_codes.drop(['age', 'fnlwgt'], axis=1).equals(first_batch_codes.drop(['age', 'fnlwgt'], axis=1))
+
+    first_batch_cleaner = IncrementalDataCleaner(ignore_update_check=True).fit(adult_data[:10000])
+    assert (first_batch_cleaner.transform(adult_data[10000:])['native-country'] == -1).any()
+
+def test_autoclean_splits():
+    """Test that cleaning several testing data sets at once gives the same results as a DataCleaner fitted on the
+    training data set, also when only some of the testing data sets have unknown categories"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[20090:20100, 'education'] = np.nan
+    training_data = adult_data[:20000]
+    testing_data = [adult_data[20000:30000].copy(), adult_data[30000:40000].copy(), adult_data[40000:].copy()]
+    testing_data[2].loc[40005, 'native-country'] = 'Atlantis'
+    mode_country = training_data['native-country'].mode()[0]
+
+    for encoder, handle_unknown in [(None, 'unknown'), (FactorizeEncoder, 'mode')]:
+        clean_training_data, clean_testing_data = autoclean_splits(training_data, testing_data, copy=True,
+                                                                   encoder=encoder, handle_unknown=handle_unknown,
+                                                                   ignore_update_check=True)
+        cleaner = DataCleaner(encoder=encoder, handle_unknown=handle_unknown, ignore_update_check=True).fit(
+            training_data)
+        assert len(clean_testing_data) == len(testing_data)
+        assert clean_training_data.equals(cleaner.transform(training_data))
+        for testing_split, clean_testing_split in zip(testing_data, clean_testing_data):
+            assert clean_testing_split.equals(cleaner.transform(testing_split))
+
+        unknown_code = clean_testing_data[2].loc[40005, 'native-country']
+        if handle_unknown == 'unknown':
+            assert unknown_code == -1
+        else:
+            assert unknown_code == clean_training_data.loc[training_data['native-country'] == mode_country,
+                                                           'native-country'].iloc[0]
+        assert not (np.asarray(clean_testing_data[0]['native-country']) == -1).any()
+
+    try:
+        autoclean_splits(training_data, testing_data, copy=True, ignore_update_check=True)
+        assert False
+    except ValueError:
+        pass
+
+def test_main_several_cv_files():
+    """Test that the command line writes every cleaned cross-validation data set to its own output file"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    splits = [adult_data[:20000], adult_data[20000:30000], adult_data[30000:]]
+
+    temp_dir = tempfile.mkdtemp()
+    original_argv = sys.argv
+    try:
+        input_filenames = [os.path.join(temp_dir, 'split{}.tsv'.format(i)) for i in range(3)]
+        output_filenames = [os.path.join(temp_dir, 'split{}_clean.tsv'.format(i)) for i in range(3)]
+        for split, input_filename in zip(splits, input_filenames):
+            split.to_csv(input_filename, sep='\t', index=False)
+
+        sys.argv = ['datacleaner', input_filenames[0], '-o', output_filenames[0],
+                    '-cv', input_filenames[1], '-cvo', output_filenames[1],
+                    '-cv', input_filenames[2], '-cvo', output_filenames[2], '--ignore-update-check']
+        main()
+        cleaned_splits = [pd.read_csv(output_filename, sep='\t') for output_filename in output_filenames]
+    finally:
+        sys.argv = original_argv
+        shutil.rmtree(temp_dir)
+
+    clean_training_data, clean_testing_data = autoclean_splits(splits[0], splits[1:], copy=True)
+    for cleaned_split, expected_split in zip(cleaned_splits, [clean_training_data] + clean_testing_data):
+        assert cleaned_split.equals(expected_split.reset_index(drop=True))
+
+def test_main_downcast_several_cv_files():
+    """Test that --downcast stores a column in the same dtype in every cleaned cross-validation data set"""
+    if importlib.util.find_spec('pyarrow') is None:
+        raise SkipTest('pyarrow is not installed')
+
+    splits = [pd.DataFrame({'A': np.arange(10), 'B': np.random.choice(['x', 'y'], 10)}),
+              pd.DataFrame({'A': np.arange(-5, 300, 61), 'B': np.random.choice(['x', 'y'], 5)})]
+
+    temp_dir = tempfile.mkdtemp()
+    original_argv = sys.argv
+    try:
+        input_filenames = [os.path.join(temp_dir, 'split{}.tsv'.format(i)) for i in range(2)]
+        output_filenames = [os.path.join(temp_dir, 'split{}_clean.parquet'.format(i)) for i in range(2)]
+        for split, input_filename in zip(splits, input_filenames):
+            split.to_csv(input_filename, sep='\t', index=False)
+
+        sys.argv = ['datacleaner', input_filenames[0], '-o', output_filenames[0], '-cv', input_filenames[1],
+                    '-cvo', output_filenames[1], '--downcast', '--max-categories', '5', '--ignore-update-check']
+        main()
+        cleaned_splits = [pd.read_parquet(output_filename) for output_filename in output_filenames]
+    finally:
+        sys.argv = original_argv
+        shutil.rmtree(temp_dir)
+
+    assert cleaned_splits[0]['A'].dtype == cleaned_splits[1]['A'].dtype == np.int16
+    assert list(cleaned_splits[1]['A']) == list(splits[1]['A'])
+    assert cleaned_splits[0]['B'].dtype == cleaned_splits[1]['B'].dtype
+
+def test_autoclean_dtype_classification():
+    """Test that autoclean() picks the median or the mode for every column from its dtype"""
+    data = pd.DataFrame({'A': pd.Series([1, 2, np.nan, 4], dtype=object),
+                         'B': pd.to_datetime(['2020-01-01', None, '2020-01-03', '2020-01-05']),
+                         'C': pd.Categorical(['x', 'y', 'x', None]),
+                         'D': ['a', None, 'a', 'b'],
+                         'E': pd.Series([None, None, None, None], dtype=object)})
+
+    hand_cleaned_data = data.copy()
+    hand_cleaned_data['A'] = LabelEncoder().fit_transform(np.array([1, 2, 2, 4]))
+    hand_cleaned_data['B'] = hand_cleaned_data['B'].fillna(hand_cleaned_data['B'].median())
+    hand_cleaned_data['C'] = hand_cleaned_data['C'].fillna('x')
+    hand_cleaned_data['D'] = LabelEncoder().fit_transform(hand_cleaned_data['D'].fillna('a').values)
+    hand_cleaned_data['E'] = LabelEncoder().fit_transform(hand_cleaned_data['E'].values)
+
+    cleaned_data = autoclean(data, copy=True)
+
+    assert cleaned_data.equals(hand_cleaned_data)
+
+def test_autoclean_nullable_dtypes():
+    """Test that autoclean() replaces the NaNs of nullable Float64 and Int64 columns with their median"""
+    data = pd.DataFrame({'A': pd.array([1.5, None, 3.0, 4.0], dtype='Float64'),
+                         'B': pd.array([1, None, 3, 3], dtype='Int64')})
+
+    cleaned_data = autoclean(data, copy=True)
+    assert cleaned_data['A'].dtype == 'Float64'
+    assert list(cleaned_data['A']) == [1.5, 3.0, 3.0, 4.0]
+    assert cleaned_data['B'].dtype == 'Int64'
+    assert list(cleaned_data['B']) == [1, 3, 3, 3]
+
+    cleaned_training_data, cleaned_testing_data = autoclean_cv(data[:2].copy(), data[1:].copy())
+    assert list(cleaned_testing_data['A']) == [1.5, 3.0, 4.0]
+    assert list(cleaned_testing_data['B']) == [1, 3, 3]
+
+def test_autoclean_batch():
+    """Test that autoclean_batch() cleans every file of a batch and reports the files it cannot clean"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    splits = [adult_data[:10000], adult_data[10000:20000], adult_data[20000:30000]]
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_pairs = [(os.path.join(temp_dir, 'split{}.tsv'.format(i)),
+                       os.path.join(temp_dir, 'clean', 'split{}.tsv'.format(i))) for i in range(len(splits))]
+        for split, (input_filename, _) in zip(splits, file_pairs):
+            split.to_csv(input_filename, sep='\t', index=False)
+        missing_filename = os.path.join(temp_dir, 'missing.tsv')
+
+        finished_files = []
+        errors = autoclean_batch(file_pairs + [(missing_filename, os.path.join(temp_dir, 'missing_clean.tsv'))],
+                                 n_jobs=2, ignore_update_check=True,
+                                 callback=lambda input_filename, *_: finished_files.append(input_filename))
+        assert list(errors) == [missing_filename]
+        assert sorted(finished_files) == sorted([input_filename for input_filename, _ in file_pairs] +
+                                                [missing_filename])
+        for split, (_, output_filename) in zip(splits, file_pairs):
+            expected_split = autoclean(split.reset_index(drop=True), copy=True)
+            assert pd.read_csv(output_filename, sep='\t').equals(expected_split)
+
+        cleaner = DataCleaner(ignore_update_check=True, handle_unknown='unknown').fit(adult_data[30000:].copy())
+        errors = autoclean_batch(file_pairs, cleaner=cleaner, n_jobs=2, ignore_update_check=True)
+        assert errors == {}
+        for split, (_, output_filename) in zip(splits, file_pairs):
+            expected_split = cleaner.transform(split.reset_index(drop=True))
+            assert pd.read_csv(output_filename, sep='\t').equals(expected_split)
+    finally:
+        shutil.rmtree(temp_dir)
+
+def test_write_npy():
+    """Test that cleaned data sets are written to memory-mapped .npy files with a single dtype"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+
+    temp_dir = tempfile.mkdtemp()
+    original_argv = sys.argv
+    try:
+        input_filename = os.path.join(temp_dir, 'adult.tsv')
+        output_filename = os.path.join(temp_dir, 'adult_clean.npy')
+        adult_data.to_csv(input_filename, sep='\t', index=False)
+
+        sys.argv = ['datacleaner', input_filename, '-o', output_filename, '--downcast', '--ignore-update-check']
+        main()
+        cleaned_adult_array = np.load(output_filename, mmap_mode='r')
+        cleaned_adult_data = autoclean(adult_data.copy())
+        downcast_dataframe(cleaned_adult_data)
+        assert isinstance(cleaned_adult_array, np.memmap)
+        assert cleaned_adult_array.dtype == np.float32
+        assert np.array_equal(cleaned_adult_array, cleaned_adult_data.to_numpy(dtype=np.float32))
+        del cleaned_adult_array
+
+        mixed_data = pd.DataFrame({'A': np.arange(5, dtype=np.int8), 'B': [True, False, True, True, False],
+                                   'C': pd.Categorical([1, 2, 1, 2, 2])})
+        write_npy(mixed_data, output_filename)
+        assert np.load(output_filename).dtype == np.int64
+        write_npy(mixed_data, output_filename, dtype=np.float32)
+        assert np.array_equal(np.load(output_filename), mixed_data.to_numpy(dtype=np.float32))
+
+        try:
+            write_npy(pd.DataFrame({'A': ['a', 'b']}), output_filename)
+            assert False
+        except ValueError:
+            pass
+
+        # --downcast is rejected instead of being ignored when it is not supported
+        chunked_filename = os.path.join(temp_dir, 'adult_chunked.tsv')
+        sys.argv = ['datacleaner', input_filename, '-o', chunked_filename, '--chunksize', '1000', '--downcast',
+                    '--ignore-update-check']
+        main()
+        assert not os.path.exists(chunked_filename)
+    finally:
+        sys.argv = original_argv
+        shutil.rmtree(temp_dir)
+
+def test_autoclean_coerce_threshold():
+    """Test that autoclean() converts text columns of numbers and dates before cleaning them"""
+    data = pd.DataFrame({'A': np.random.rand(1000).round(3).astype(str).astype(object),
+                         'B': pd.date_range('2020-01-01', periods=1000, freq='D').strftime('%Y-%m-%d').astype(object),
+                         'C': np.random.choice(['oranges', 'apples', 'bananas'], 1000).astype(object)})
+    data.loc[::10, 'A'] = 'NA'
+    data.loc[::20, 'B'] = None
+
+    hand_cleaned_data = data.copy()
+    hand_cleaned_data['A'] = pd.to_numeric(hand_cleaned_data['A'], errors='coerce')
+    hand_cleaned_data['A'] = hand_cleaned_data['A'].fillna(hand_cleaned_data['A'].median())
+    hand_cleaned_data['B'] = pd.to_datetime(hand_cleaned_data['B'])
+    hand_cleaned_data['B'] = hand_cleaned_data['B'].fillna(hand_cleaned_data['B'].median())
+    hand_cleaned_data['C'] = LabelEncoder().fit_transform(hand_cleaned_data['C'].values)
+
+    assert autoclean(data, copy=True, coerce_threshold=0.85).equals(hand_cleaned_data)
+    # With a threshold above the fraction of numbers, column A is encoded as categories
+    assert autoclean(data, copy=True, coerce_threshold=0.95)['A'].dtype == np.int64
+
+    training_data = data[:500].copy()
+    testing_data = data[500:].copy()
+    testing_data.loc[510:520, 'A'] = 'unknown'
+    cleaner = DataCleaner(coerce_threshold=0.85).fit(training_data)
+    assert cleaner.coerced_columns_ == {'A': 'numeric', 'B': 'datetime'}
+    cleaned_testing_data = cleaner.transform(testing_data)
+    assert (cleaned_testing_data.loc[510:520, 'A'] == cleaner.fill_values_['A']).all()
+    assert cleaned_testing_data['B'].dtype == hand_cleaned_data['B'].dtype
+
+    # Dates are parsed in the format guessed from the column, day first if that parses more of them, and words
+    # that pandas would parse as the current date are not dates
+    date_data = pd.DataFrame({'D': pd.date_range('2020-01-01', periods=100, freq='D').strftime('%d/%m/%Y'),
+                              'E': ['today', 'now', 'today', '2020-01-01'] * 25})
+    cleaner = DataCleaner(coerce_threshold=0.5, ignore_update_check=True).fit(date_data)
+    assert cleaner.coerced_columns_ == {'D': 'datetime'}
+    cleaned_date_data = cleaner.transform(date_data)
+    assert cleaned_date_data['D'].equals(pd.Series(pd.date_range('2020-01-01', periods=100, freq='D'), name='D'))
+    assert cleaner.compile().transform({'D': 'now', 'E': 'now'})['D'] == cleaner.fill_values_['D']
+
+def test_compiled_cleaner():
+    """Test that compiled DataCleaners clean single records and lists of records like transform()"""
+    adult_data = pd.read_csv('adult.csv.gz', sep='\t', compression='gzip')
+    adult_data.loc[30:60, 'age'] = np.nan
+    adult_data.loc[90:100, 'education'] = np.nan
+
+    training_data = adult_data[:20000]
+    testing_data = adult_data[20000:].copy()
+    testing_data.loc[20005, 'education'] = 'Unknown'
+    testing_data.loc[20010:20020, 'education'] = np.nan
+
+    for cleaner in [DataCleaner(ignore_update_check=True, handle_unknown='unknown'),
+                    DataCleaner(ignore_update_check=True, handle_unknown='mode'),
+                    IncrementalDataCleaner(ignore_update_check=True, handle_unknown='mode')]:
+        cleaner.fit(training_data)
+        compiled_cleaner = cleaner.compile()
+        cleaned_testing_data = cleaner.transform(testing_data)
+        cleaned_records = pd.DataFrame(compiled_cleaner.transform(testing_data.to_dict('records')),
+                                       index=testing_data.index)
+        assert np.array_equal(cleaned_records[cleaned_testing_data.columns].to_numpy(dtype=np.float64),
+                              cleaned_testing_data.to_numpy(dtype=np.float64))
+        assert compiled_cleaner.transform(testing_data.loc[20010].to_dict()) == cleaned_records.loc[20010].to_dict()
+
+    compiled_cleaner = DataCleaner(ignore_update_check=True).fit(training_data).compile()
+    try:
+        compiled_cleaner.transform(testing_data.loc[20005].to_dict())
+        assert False
+    except ValueError:
+        pass
+
+def test_frame_encoders():
+    """Test the count, frequency, and sparse one-hot encoders of all categorical columns at once"""
+    data = pd.DataFrame({'A': np.random.rand(1000),
+                         'B': np.random.choice(['oranges', 'apples', 'bananas'], 1000).astype(object),
+                         'C': np.random.choice(['red', 'green', 'apples'], 1000).astype(object)})
+    data.loc[10:20, 'B'] = np.nan
+
+    hand_filled_data = data.copy()
+    hand_filled_data['B'] = hand_filled_data['B'].fillna(hand_filled_data['B'].mode()[0])
+
+    hand_cleaned_data = hand_filled_data.copy()
+    for column in ['B', 'C']:
+        hand_cleaned_data[column] = hand_cleaned_data[column].map(hand_cleaned_data[column].value_counts()).values
+    assert autoclean(data, copy=True, encoder=CountEncoder).equals(hand_cleaned_data)
+
+    cleaned_data = autoclean(data, copy=True, encoder=FrequencyEncoder)
+    assert np.allclose(cleaned_data[['B', 'C']].values, hand_cleaned_data[['B', 'C']].values / 1000.)
+
+    cleaned_data = autoclean(data, copy=True, encoder=SparseOneHotEncoder)
+    hand_cleaned_data = pd.get_dummies(hand_filled_data, columns=['B', 'C'], prefix_sep='=', dtype=np.uint8)
+    assert list(cleaned_data.columns[:1]) == ['A']
+    assert sorted(cleaned_data.columns) == sorted(hand_cleaned_data.columns)
+    assert all(isinstance(dtype, pd.SparseDtype) for dtype in cleaned_data.dtypes.values[1:])
+    dense_data = cleaned_data.astype(dict((column, np.uint8) for column in cleaned_data.columns[1:]))
+    assert dense_data[hand_cleaned_data.columns].equals(hand_cleaned_data)
+
+    # Downcasting keeps the sparse indicator columns as they are
+    downcast_data = autoclean(data, copy=True, encoder=SparseOneHotEncoder, downcast=True)
+    assert (downcast_data.dtypes.values[1:] == cleaned_data.dtypes.values[1:]).all()
+    assert downcast_data.equals(cleaned_data)
+
+    training_data = data[:500].copy()
+    testing_data = data[500:].copy()
+    testing_data.loc[510, 'C'] = 'blue'
+    cleaner = DataCleaner(encoder=SparseOneHotEncoder, handle_unknown='unknown').fit(training_data)
+    cleaned_testing_data = cleaner.transform(testing_data)
+    assert list(cleaned_testing_data.columns) == ['A'] + list(cleaner.frame_encoder_.get_feature_names_out())
+    assert cleaned_testing_data.loc[510, [column for column in cleaned_testing_data.columns
+                                          if column.startswith('C=')]].sum() == 0
+
+    try:
+        DataCleaner(encoder=CountEncoder).fit(training_data).transform(testing_data)
+        assert False
+    except ValueError:
+        pass
+
+    # With handle_unknown='mode', unknown categories are encoded like the most frequent category of their column
+    cleaned_testing_data = DataCleaner(encoder=CountEncoder, handle_unknown='mode').fit(
+        training_data).transform(testing_data)
+    assert cleaned_testing_data.loc[510, 'C'] == training_data['C'].value_counts().max()
+
+    # The base class encodes every category by its position among the categories of its column
+    frame_encoder = datacleaner.encoders._FrameEncoder().fit(training_data[['B', 'C']])
+    encoded_testing_data = frame_encoder.transform(testing_data[['B', 'C']])
+    for column in ['B', 'C']:
+        expected_codes = pd.Index(frame_encoder.categories_[column]).get_indexer(testing_data[column])
+        assert np.array_equal(encoded_testing_data[column].values, expected_codes)
+    assert encoded_testing_data['C'].iloc[10] == -1